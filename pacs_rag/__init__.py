@@ -4,7 +4,7 @@ from .embedder import EmbeddingProvider, HashEmbeddingProvider, OllamaEmbeddingP
 from .index import SqliteIndex, Suggestion
 from .lexicon import cluster_terms, suggest_ngrams
 from .ingest import ingest_from_mcp, ingest_from_mcp_async, ingest_terms
-from .retrieve import retrieve
+from .retrieve import RetrieveBatcher, retrieve, retrieve_many
 
 __all__ = [
     "EmbeddingProvider",
@@ -19,4 +19,6 @@ __all__ = [
     "cluster_terms",
     "suggest_ngrams",
     "retrieve",
+    "retrieve_many",
+    "RetrieveBatcher",
 ]
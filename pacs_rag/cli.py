@@ -24,6 +24,7 @@ def main() -> None:
     ingest_cmd.add_argument("--model", default=None)
     ingest_cmd.add_argument("--base-url", dest="base_url", default=None)
     ingest_cmd.add_argument("--dim", type=int, default=64)
+    ingest_cmd.add_argument("--workers", type=int, default=1)
 
     ingest_mcp_cmd = sub.add_parser("ingest-mcp", help="Ingest terms via MCP")
     ingest_mcp_cmd.add_argument("--mcp-command", dest="mcp_command", default="dicom-mcp")
@@ -39,6 +40,7 @@ def main() -> None:
     ingest_mcp_cmd.add_argument("--model", default=None)
     ingest_mcp_cmd.add_argument("--base-url", dest="base_url", default=None)
     ingest_mcp_cmd.add_argument("--dim", type=int, default=64)
+    ingest_mcp_cmd.add_argument("--workers", type=int, default=1)
 
     retrieve_cmd = sub.add_parser("retrieve", help="Retrieve suggestions")
     retrieve_cmd.add_argument("--index", required=True)
@@ -58,9 +60,14 @@ def main() -> None:
 
     args = parser.parse_args()
     if args.command == "ingest":
-        embedder = build_embedder(args.provider, args.model, args.base_url, args.dim)
+        embedder = build_embedder(
+            args.provider, args.model, args.base_url, args.dim, workers=args.workers
+        )
         terms = json.loads(open(args.input, "r", encoding="utf-8").read())
-        ingest_terms(args.index, terms, embedder)
+        try:
+            ingest_terms(args.index, terms, embedder)
+        finally:
+            _close_embedder(embedder)
         return
 
     if args.command == "retrieve":
@@ -82,7 +89,9 @@ def main() -> None:
         except Exception as exc:  # pragma: no cover - optional dependency
             raise SystemExit(f"MCP dependency missing: {exc}")
 
-        embedder = build_embedder(args.provider, args.model, args.base_url, args.dim)
+        embedder = build_embedder(
+            args.provider, args.model, args.base_url, args.dim, workers=args.workers
+        )
         stdio_args = list(args.args)
         if args.config_path:
             stdio_args.insert(0, args.config_path)
@@ -105,23 +114,29 @@ def main() -> None:
 
         import asyncio
 
-        asyncio.run(_run())
+        try:
+            asyncio.run(_run())
+        finally:
+            _close_embedder(embedder)
         return
 
     if args.command == "export-lexicon":
-        index = SqliteIndex(args.index)
-        terms = index.top_terms(min_count=args.min_count, limit=args.limit)
-        term_texts = [
-            term["text"]
-            for term in terms
-            for _ in range(max(1, int(term.get("count") or 1)))
+        with SqliteIndex(args.index) as index:
+            terms = index.top_terms(min_count=args.min_count, limit=args.limit)
+        weighted_terms = [
+            (term["text"], max(1, int(term.get("count") or 1))) for term in terms
         ]
-        clusters = cluster_terms(term_texts)
+        clusters = cluster_terms(weighted_terms)
         output = {
             "synonyms": {term["text"]: [] for term in terms},
-            "ngrams": suggest_ngrams(term_texts, n=2, min_count=args.min_count),
+            "ngrams": suggest_ngrams(weighted_terms, n=2, min_count=args.min_count),
             "clusters": [
-                {"seed": cluster.seed, "terms": cluster.terms, "score": cluster.score}
+                {
+                    "seed": cluster.seed,
+                    "terms": cluster.terms,
+                    "score": cluster.score,
+                    "count": cluster.count,
+                }
                 for cluster in clusters
                 if len(cluster.terms) > 1
             ],
@@ -135,5 +150,12 @@ def main() -> None:
     parser.print_help()
 
 
+def _close_embedder(embedder: object) -> None:
+    # Only some providers hold resources (the hash provider's worker pool).
+    close = getattr(embedder, "close", None)
+    if close is not None:
+        close()
+
+
 if __name__ == "__main__":
     main()
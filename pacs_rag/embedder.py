@@ -1,70 +1,180 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 import hashlib
+from itertools import repeat
 import json
-import math
-from typing import Protocol
-from urllib import request
+from typing import Any, Protocol
+from urllib import error, request
+
+import numpy as np
 
 
 class EmbeddingProvider(Protocol):
-    def embed(self, texts: list[str]) -> list[list[float]]:
+    def embed(self, texts: list[str]) -> list[list[float]] | np.ndarray:
         ...
 
+    def embed_one(self, text: str) -> list[float] | np.ndarray:
+        return self.embed([text])[0]
+
+
+# Smallest per-process slice worth the pickling round trip.
+_PARALLEL_CHUNK = 4096
+
 
 @dataclass
 class HashEmbeddingProvider:
     dim: int = 64
+    workers: int = 1
+    # Worker processes (and their warm token caches) kept across embed() calls;
+    # started by the first parallel batch and shut down by close().
+    _pool: ProcessPoolExecutor | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
-    def embed(self, texts: list[str]) -> list[list[float]]:
-        vectors: list[list[float]] = []
-        for text in texts:
-            vector = [0.0] * self.dim
-            tokens = [token for token in text.lower().split() if token]
-            for token in tokens:
-                digest = hashlib.md5(token.encode("utf-8")).digest()
-                idx = int.from_bytes(digest[:4], "little") % self.dim
-                vector[idx] += 1.0
-            norm = math.sqrt(sum(value * value for value in vector))
-            if norm:
-                vector = [value / norm for value in vector]
-            vectors.append(vector)
-        return vectors
+    def __enter__(self) -> "HashEmbeddingProvider":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        if self.workers > 1 and len(texts) >= 2 * _PARALLEL_CHUNK:
+            return self._embed_parallel(texts)
+        return _hash_embed(texts, self.dim)
+
+    @property
+    def ingest_chunk_size(self) -> int | None:
+        # embed() only fans out from 2 * _PARALLEL_CHUNK texts, so ask ingest for chunks
+        # that give every worker a full slice; None keeps the caller's default.
+        if self.workers <= 1:
+            return None
+        return self.workers * _PARALLEL_CHUNK
+
+    def embed_one(self, text: str) -> np.ndarray:
+        buckets = [_token_bucket(token, self.dim) for token in text.lower().split()]
+        vector = np.bincount(np.asarray(buckets, dtype=np.int64), minlength=self.dim)
+        vector = vector.astype(np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def _embed_parallel(self, texts: list[str]) -> np.ndarray:
+        # Tokenizing is GIL-bound Python, so fan out across processes, not threads.
+        chunk = max(_PARALLEL_CHUNK, -(-len(texts) // self.workers))
+        batches = [texts[start : start + chunk] for start in range(0, len(texts), chunk)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return np.vstack(list(self._pool.map(_hash_embed, batches, repeat(self.dim))))
+
+
+def _hash_embed(texts: list[str], dim: int) -> np.ndarray:
+    rows: list[int] = []
+    buckets: list[int] = []
+    for row, text in enumerate(texts):
+        for token in text.lower().split():
+            rows.append(row)
+            buckets.append(_token_bucket(token, dim))
+    # Scatter all token hits for the batch in one pass, then L2-normalize rows.
+    flat = np.asarray(rows, dtype=np.int64) * dim + np.asarray(buckets, dtype=np.int64)
+    counts = np.bincount(flat, minlength=len(texts) * dim)
+    vectors = counts.astype(np.float32).reshape(len(texts), dim)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+@lru_cache(maxsize=65536)
+def _token_bucket(token: str, dim: int) -> int:
+    # PACS vocabularies are small and repetitive, so each token is hashed once.
+    digest = hashlib.md5(token.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "little") % dim
 
 
 @dataclass
 class OllamaEmbeddingProvider:
     base_url: str
     model: str
+    batch_size: int = 64
+    max_workers: int = 8
+    _batch_supported: bool = field(default=True, init=False, repr=False)
 
     def embed(self, texts: list[str]) -> list[list[float]]:
         vectors: list[list[float]] = []
-        for text in texts:
-            payload = json.dumps({"model": self.model, "prompt": text}).encode("utf-8")
-            req = request.Request(
-                url=f"{self.base_url.rstrip('/')}/api/embeddings",
-                data=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            with request.urlopen(req, timeout=30) as response:
-                body = json.loads(response.read().decode("utf-8"))
-            embedding = body.get("embedding")
-            if not isinstance(embedding, list):
-                raise ValueError("Invalid embedding response")
-            vectors.append([float(value) for value in embedding])
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start : start + self.batch_size]
+            if self._batch_supported:
+                try:
+                    vectors.extend(self._embed_batch(batch))
+                    continue
+                except error.HTTPError as exc:
+                    if exc.code != 404:
+                        raise
+                    # Older Ollama servers only expose the single-prompt endpoint.
+                    self._batch_supported = False
+            vectors.extend(self._embed_each(batch))
         return vectors
 
+    def embed_one(self, text: str) -> list[float]:
+        if self._batch_supported:
+            try:
+                return self._embed_batch([text])[0]
+            except error.HTTPError as exc:
+                if exc.code != 404:
+                    raise
+                self._batch_supported = False
+        return self._embed_prompt(text)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        body = self._post("/api/embed", {"model": self.model, "input": texts})
+        embeddings = body.get("embeddings")
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise ValueError("Invalid embedding response")
+        return [_as_vector(embedding) for embedding in embeddings]
+
+    def _embed_each(self, texts: list[str]) -> list[list[float]]:
+        # Overlap round trips; map() keeps results aligned with the input order.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self._embed_prompt, texts))
+
+    def _embed_prompt(self, text: str) -> list[float]:
+        body = self._post("/api/embeddings", {"model": self.model, "prompt": text})
+        return _as_vector(body.get("embedding"))
+
+    def _post(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        req = request.Request(
+            url=f"{self.base_url.rstrip('/')}{path}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+
+def _as_vector(embedding: object) -> list[float]:
+    if not isinstance(embedding, list):
+        raise ValueError("Invalid embedding response")
+    return [float(value) for value in embedding]
+
 
 def build_embedder(
     provider: str,
     model: str | None,
     base_url: str | None,
     dim: int,
+    workers: int = 1,
 ) -> EmbeddingProvider:
     provider_norm = provider.strip().lower() if provider else "hash"
     if provider_norm == "ollama":
         if not model or not base_url:
             raise ValueError("Ollama embedder requires model and base_url")
         return OllamaEmbeddingProvider(base_url=base_url, model=model)
-    return HashEmbeddingProvider(dim=dim)
+    return HashEmbeddingProvider(dim=dim, workers=workers)
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 import json
-import math
+import os
 import sqlite3
-from typing import Iterable
+import threading
+from typing import Callable, Iterable
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - optional dependency
+    simsimd = None
 
 from .embedder import EmbeddingProvider
 
@@ -19,16 +28,83 @@ class Suggestion:
     last_seen_date: str | None = None
 
 
+@dataclass(frozen=True)
+class _TermMatrix:
+    # Column layout: scoring streams only `vectors`; metadata is gathered for top-k rows.
+    vectors: np.ndarray
+    texts: np.ndarray
+    levels: np.ndarray
+    modalities: np.ndarray
+    counts: np.ndarray
+    dates: np.ndarray
+    # Scoring kernel chosen once for this matrix's storage type and backend.
+    kernel: Callable[[_TermMatrix, np.ndarray], np.ndarray]
+    # Per-row dequantization factors when `vectors` holds int8 codes.
+    scales: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+
+# Matrices shared by every SqliteIndex in the process, keyed by (abspath, quantize)
+# and validated against the database files' stat signature.
+_MATRIX_CACHE: OrderedDict[tuple[str, str | None], tuple[tuple[int, ...], _TermMatrix]] = (
+    OrderedDict()
+)
+_MATRIX_CACHE_SIZE = 4
+_MATRIX_CACHE_LOCK = threading.Lock()
+
+
 class SqliteIndex:
-    def __init__(self, path: str) -> None:
+    def __init__(
+        self,
+        path: str,
+        quantize: str | None = None,
+        cache_vectors: bool = True,
+    ) -> None:
+        if quantize not in (None, "int8"):
+            raise ValueError(f"Unsupported quantization: {quantize}")
+        if quantize == "int8" and simsimd is None:
+            raise RuntimeError("int8 quantization requires simsimd (pacs-rag[speedups])")
         self.path = path
+        self.quantize = quantize
+        self.cache_vectors = cache_vectors
+        self._cache: _TermMatrix | None = None
+        # sqlite3 shares cached statements across a connection's users, so threads
+        # sharing this index (check_same_thread=False) take turns on it.
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._ensure_schema()
+        # Identity of the file this connection opened; a replaced file gets a new one.
+        self.file_id = _file_id(path)
+
+    def __enter__(self) -> "SqliteIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        dot = _dot_blobs_simsimd if simsimd is not None else _dot_blobs
+        conn.create_function("dot", 2, dot, deterministic=True)
+        return conn
 
     def _ensure_schema(self) -> None:
-        with sqlite3.connect(self.path) as conn:
+        with self._lock, self._conn as conn:
             existing = conn.execute("PRAGMA table_info(terms)").fetchall()
             if not existing:
                 self._create_terms_table(conn)
+                self._create_terms_indexes(conn)
                 return
             pk_columns = [
                 row[1]
@@ -37,6 +113,8 @@ class SqliteIndex:
             ]
             if pk_columns != ["text", "level", "modality"]:
                 self._migrate_terms_table(conn)
+            self._migrate_vector_blobs(conn)
+            self._create_terms_indexes(conn)
 
     def _create_terms_table(self, conn: sqlite3.Connection) -> None:
         conn.execute(
@@ -47,12 +125,21 @@ class SqliteIndex:
                 modality TEXT NOT NULL,
                 count INTEGER,
                 last_seen_date TEXT,
-                vector TEXT,
+                vector BLOB,
                 PRIMARY KEY (text, level, modality)
             )
             """
         )
 
+    def _create_terms_indexes(self, conn: sqlite3.Connection) -> None:
+        # Serves top_terms' WHERE count >= ? ORDER BY count DESC, text ASC without a sort.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_terms_count_text ON terms(count DESC, text ASC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_terms_modality_level ON terms(modality, level)"
+        )
+
     def _migrate_terms_table(self, conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE terms RENAME TO terms_old")
         self._create_terms_table(conn)
@@ -71,43 +158,51 @@ class SqliteIndex:
         )
         conn.execute("DROP TABLE terms_old")
 
+    def _migrate_vector_blobs(self, conn: sqlite3.Connection) -> None:
+        # Older indexes stored vectors as JSON text; rewrite them as float32 blobs.
+        rows = conn.execute(
+            "SELECT rowid, vector FROM terms WHERE typeof(vector) = 'text'"
+        ).fetchall()
+        if not rows:
+            return
+        conn.executemany(
+            "UPDATE terms SET vector = ? WHERE rowid = ?",
+            [
+                (_encode_vector(json.loads(vector)) if vector else None, rowid)
+                for rowid, vector in rows
+            ],
+        )
+
     def upsert_terms(self, terms: list[dict], vectors: list[list[float]]) -> None:
         if len(terms) != len(vectors):
             raise ValueError("terms and vectors must have same length")
-        with sqlite3.connect(self.path) as conn:
-            for term, vector in zip(terms, vectors, strict=True):
-                text = term.get("text")
-                if not text:
-                    continue
-                level = _normalize_key(term.get("level"))
-                modality = _normalize_key(term.get("modality"))
-                existing = conn.execute(
-                    "SELECT count FROM terms WHERE text = ? AND level = ? AND modality = ?",
-                    (text, level, modality),
-                ).fetchone()
-                count = int(term.get("count") or 1)
-                if existing:
-                    count = max(count, int(existing[0]))
-                conn.execute(
-                    """
-                    INSERT INTO terms (text, level, modality, count, last_seen_date, vector)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(text, level, modality) DO UPDATE SET
-                        level=excluded.level,
-                        modality=excluded.modality,
-                        count=excluded.count,
-                        last_seen_date=excluded.last_seen_date,
-                        vector=excluded.vector
-                    """,
-                    (
-                        text,
-                        level,
-                        modality,
-                        count,
-                        term.get("last_seen_date"),
-                        json.dumps(vector),
-                    ),
-                )
+        self._cache = None
+        _invalidate_matrix(self.path)
+        rows = [
+            (
+                term["text"],
+                _normalize_key(term.get("level")),
+                _normalize_key(term.get("modality")),
+                int(term.get("count") or 1),
+                term.get("last_seen_date"),
+                _encode_vector(vector),
+            )
+            for term, vector in zip(terms, vectors, strict=True)
+            if term.get("text")
+        ]
+        # One implicit transaction for the whole batch; the database keeps the max count.
+        with self._lock, self._conn as conn:
+            conn.executemany(
+                """
+                INSERT INTO terms (text, level, modality, count, last_seen_date, vector)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(text, level, modality) DO UPDATE SET
+                    count=MAX(COALESCE(terms.count, 0), excluded.count),
+                    last_seen_date=excluded.last_seen_date,
+                    vector=excluded.vector
+                """,
+                rows,
+            )
 
     def retrieve(
         self,
@@ -115,35 +210,155 @@ class SqliteIndex:
         top_k: int = 10,
         min_score: float = 0.2,
     ) -> list[Suggestion]:
-        if not query_vector:
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.size == 0 or top_k <= 0:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm:
+            query = query / norm
+        if not self.cache_vectors:
+            return self._retrieve_streaming(query, top_k, min_score)
+        cache = self._load_cache()
+        if not len(cache):
             return []
-        with sqlite3.connect(self.path) as conn:
+        if query.shape[0] != cache.vectors.shape[1]:
+            raise ValueError(
+                f"query vector has {query.shape[0]} dimensions, "
+                f"index has {cache.vectors.shape[1]}"
+            )
+        # Stored rows are unit length, so a dot product yields cosine scores.
+        scores = cache.kernel(cache, query)
+        candidates = np.flatnonzero(scores >= min_score)
+        if candidates.size > top_k:
+            # Keep every row tied with the k-th best score so the cut below is made in
+            # insertion order rather than by argpartition's arbitrary pick among ties.
+            kth = np.partition(scores[candidates], candidates.size - top_k)[-top_k]
+            candidates = candidates[scores[candidates] >= kth]
+        # Highest score first; ties keep insertion order for reproducible output.
+        order = candidates[np.lexsort((candidates, -scores[candidates]))][:top_k]
+        return [
+            Suggestion(
+                text=text,
+                score=float(score),
+                level=level,
+                modality=modality,
+                count=count,
+                last_seen_date=last_seen_date,
+            )
+            for text, score, level, modality, count, last_seen_date in zip(
+                cache.texts[order],
+                scores[order],
+                cache.levels[order],
+                cache.modalities[order],
+                cache.counts[order],
+                cache.dates[order],
+            )
+        ]
+
+    def _retrieve_streaming(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        min_score: float,
+    ) -> list[Suggestion]:
+        # Score inside SQLite so only the top-k rows are materialized in Python.
+        query_blob = query.tobytes()
+        with self._lock, self._conn as conn:
+            stored = conn.execute(
+                "SELECT length(vector) FROM terms WHERE length(vector) > 0 LIMIT 1"
+            ).fetchone()
+            if stored is None:
+                return []
+            if stored[0] != len(query_blob):
+                raise ValueError(
+                    f"query vector has {query.shape[0]} dimensions, index has {stored[0] // 4}"
+                )
+            # LIMIT -1 keeps SQLite from flattening the subquery, which would call
+            # dot() again for the ORDER BY on every row passing the WHERE.
             rows = conn.execute(
-                "SELECT text, level, modality, count, last_seen_date, vector FROM terms"
-            ).fetchall()
-        results: list[Suggestion] = []
-        for text, level, modality, count, last_seen_date, vector_json in rows:
-            if not vector_json:
-                continue
-            vector = json.loads(vector_json)
-            score = _cosine_similarity(query_vector, vector)
-            if score < min_score:
-                continue
-            results.append(
-                Suggestion(
-                    text=text,
-                    score=score,
-                    level=_denormalize_key(level),
-                    modality=_denormalize_key(modality),
-                    count=count,
-                    last_seen_date=last_seen_date,
+                """
+                SELECT text, level, modality, count, last_seen_date, score
+                FROM (
+                    SELECT rowid, text, level, modality, count, last_seen_date,
+                           dot(?, vector) AS score
+                    FROM terms
+                    WHERE length(vector) > 0
+                    LIMIT -1
                 )
+                WHERE score >= ?
+                ORDER BY score DESC, rowid ASC
+                LIMIT ?
+                """,
+                (query_blob, min_score, top_k),
+            ).fetchall()
+        return [
+            Suggestion(
+                text=text,
+                score=score,
+                level=_denormalize_key(level),
+                modality=_denormalize_key(modality),
+                count=count,
+                last_seen_date=last_seen_date,
             )
-        results.sort(key=lambda item: item.score, reverse=True)
-        return results[:top_k]
+            for text, level, modality, count, last_seen_date, score in rows
+        ]
+
+    def _load_cache(self) -> _TermMatrix:
+        signature = _file_signature(self.path)
+        if signature is None:
+            # In-memory databases are private to this connection; cache per instance.
+            if self._cache is None:
+                self._cache = self._read_matrix()
+            return self._cache
+        key = (os.path.abspath(self.path), self.quantize)
+        with _MATRIX_CACHE_LOCK:
+            cached = _MATRIX_CACHE.get(key)
+            if cached is not None and cached[0] == signature:
+                _MATRIX_CACHE.move_to_end(key)
+                return cached[1]
+        matrix = self._read_matrix()
+        if signature[:2] != self.file_id:
+            # The path now names a different file than this connection reads; never
+            # publish that stale matrix under the new file's signature.
+            return matrix
+        with _MATRIX_CACHE_LOCK:
+            _MATRIX_CACHE[key] = (signature, matrix)
+            _MATRIX_CACHE.move_to_end(key)
+            while len(_MATRIX_CACHE) > _MATRIX_CACHE_SIZE:
+                _MATRIX_CACHE.popitem(last=False)
+        return matrix
+
+    def _read_matrix(self) -> _TermMatrix:
+        with self._lock, self._conn as conn:
+            rows = conn.execute(
+                """
+                SELECT text, level, modality, count, last_seen_date, vector
+                FROM terms
+                WHERE length(vector) > 0
+                """
+            ).fetchall()
+        texts, levels, modalities, counts, dates, blobs = zip(*rows) if rows else ((),) * 6
+        dims = {len(blob) for blob in blobs}
+        if len(dims) > 1:
+            raise ValueError("index contains vectors of mixed dimensions")
+        dim = dims.pop() // 4 if dims else 0
+        vectors = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), dim)
+        scales = None
+        if self.quantize == "int8":
+            vectors, scales = _quantize_int8(vectors)
+        return _TermMatrix(
+            vectors=vectors,
+            texts=_column(texts),
+            levels=_column([_denormalize_key(level) for level in levels]),
+            modalities=_column([_denormalize_key(modality) for modality in modalities]),
+            counts=_column(counts),
+            dates=_column(dates),
+            kernel=_select_kernel(quantized=scales is not None),
+            scales=scales,
+        )
 
     def top_terms(self, min_count: int = 1, limit: int = 200) -> list[dict]:
-        with sqlite3.connect(self.path) as conn:
+        with self._lock, self._conn as conn:
             rows = conn.execute(
                 """
                 SELECT text, level, modality, count, last_seen_date
@@ -166,20 +381,90 @@ class SqliteIndex:
         ]
 
 
-def _cosine_similarity(left: list[float], right: list[float]) -> float:
-    if not left or not right:
-        return 0.0
-    length = min(len(left), len(right))
-    numerator = 0.0
-    left_norm = 0.0
-    right_norm = 0.0
-    for i in range(length):
-        numerator += left[i] * right[i]
-        left_norm += left[i] * left[i]
-        right_norm += right[i] * right[i]
-    if left_norm == 0.0 or right_norm == 0.0:
-        return 0.0
-    return numerator / math.sqrt(left_norm * right_norm)
+def _file_signature(path: str) -> tuple[int, ...] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # WAL commits may only touch the -wal file until the next checkpoint.
+    try:
+        wal = os.stat(f"{path}-wal")
+        wal_signature = (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        wal_signature = (0, 0)
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size, *wal_signature)
+
+
+def _file_id(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def _invalidate_matrix(path: str) -> None:
+    path = os.path.abspath(path)
+    with _MATRIX_CACHE_LOCK:
+        for key in [key for key in _MATRIX_CACHE if key[0] == path]:
+            del _MATRIX_CACHE[key]
+
+
+def _score_float32(cache: _TermMatrix, query: np.ndarray) -> np.ndarray:
+    return cache.vectors @ query
+
+
+def _score_float32_simsimd(cache: _TermMatrix, query: np.ndarray) -> np.ndarray:
+    return np.asarray(simsimd.cdist(query[np.newaxis, :], cache.vectors, metric="dot"))[0]
+
+
+def _score_int8_simsimd(cache: _TermMatrix, query: np.ndarray) -> np.ndarray:
+    codes, scale = _quantize_int8(query[np.newaxis, :])
+    dots = np.asarray(simsimd.cdist(codes, cache.vectors, metric="dot"))[0]
+    return dots * cache.scales * scale[0]
+
+
+def _select_kernel(quantized: bool) -> Callable[[_TermMatrix, np.ndarray], np.ndarray]:
+    if quantized:
+        return _score_int8_simsimd
+    if simsimd is not None:
+        return _score_float32_simsimd
+    return _score_float32
+
+
+def _dot_blobs(left: bytes, right: bytes) -> float:
+    left_vector = np.frombuffer(left, dtype=np.float32)
+    right_vector = np.frombuffer(right, dtype=np.float32)
+    return float(np.dot(left_vector, right_vector))
+
+
+def _dot_blobs_simsimd(left: bytes, right: bytes) -> float:
+    # Typed memoryviews let SimSIMD read the float32 blobs in place, skipping NumPy.
+    return float(simsimd.dot(memoryview(left).cast("f"), memoryview(right).cast("f")))
+
+
+def _quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Symmetric per-row quantization: row ~= codes * scale, codes in [-127, 127].
+    scales = np.abs(vectors).max(axis=1, initial=0.0) / 127.0
+    scales[scales == 0.0] = 1.0
+    codes = np.round(vectors / scales[:, np.newaxis]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _column(values: Iterable[object]) -> np.ndarray:
+    values = list(values)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _encode_vector(vector: list[float]) -> bytes:
+    # Normalize once on write so retrieval never recomputes stored-vector norms.
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if norm:
+        array = array / norm
+    return array.tobytes()
 
 
 def _normalize_key(value: object | None) -> str:
@@ -1,24 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import date, datetime
 import re
-from itertools import islice
+from itertools import batched, islice
 from typing import Iterable
 
 from .embedder import EmbeddingProvider
 from .index import SqliteIndex
+from .retrieve import retrieve_cache_clear
+
+_LONG_NUMBER_RE = re.compile(r"\b\d{6,}\b")
+_NON_DIGIT_RE = re.compile(r"\D")
+_DEFAULT_CHUNK_SIZE = 1024
 
 
 def ingest_terms(
     index_path: str,
-    terms: list[dict],
+    terms: Iterable[dict],
     embedder: EmbeddingProvider,
+    chunk_size: int | None = None,
 ) -> None:
-    entries = [term for term in terms if term.get("text")]
-    # Embed in one batch to keep vectors aligned with their source text.
-    vectors = embedder.embed([term.get("text", "") for term in entries])
-    index = SqliteIndex(index_path)
-    index.upsert_terms(entries, vectors)
+    if chunk_size is None:
+        # Providers may ask for larger chunks, e.g. to reach their parallel threshold.
+        chunk_size = getattr(embedder, "ingest_chunk_size", None) or _DEFAULT_CHUNK_SIZE
+    entries = (term for term in terms if term.get("text"))
+    with SqliteIndex(index_path) as index:
+        # Embed and upsert chunk by chunk so peak memory stays O(chunk_size * dim);
+        # each chunk is embedded in one batch to keep vectors aligned with their text.
+        for chunk in batched(entries, chunk_size):
+            vectors = embedder.embed([term["text"] for term in chunk])
+            index.upsert_terms(list(chunk), vectors)
+    retrieve_cache_clear()
 
 
 def ingest_from_mcp(
@@ -41,38 +54,13 @@ def ingest_from_mcp(
     terms: list[dict] = []
     # Collect study/series text, then aggregate counts and recency before indexing.
     for study in studies:
-        description = _safe_text(_get_attr(study, "StudyDescription"))
-        modality = _normalize_modality(_get_attr(study, "ModalitiesInStudy"))
-        study_date_value = _get_attr(study, "StudyDate")
-        if description:
-            terms.append(
-                {
-                    "text": description,
-                    "level": "study",
-                    "modality": modality,
-                    "count": 1,
-                    "last_seen_date": study_date_value,
-                }
-            )
-
+        terms.extend(_study_terms(study))
         if include_series and query_series is not None:
             study_uid = _get_attr(study, "StudyInstanceUID")
             if not study_uid:
                 continue
-            for series in query_series(study_instance_uid=study_uid):
-                for field in ["SeriesDescription", "BodyPartExamined", "ProtocolName"]:
-                    text = _safe_text(_get_attr(series, field))
-                    if not text:
-                        continue
-                    terms.append(
-                        {
-                            "text": text,
-                            "level": "series",
-                            "modality": _normalize_modality(_get_attr(series, "Modality")),
-                            "count": 1,
-                            "last_seen_date": study_date_value,
-                        }
-                    )
+            series_list = query_series(study_instance_uid=study_uid)
+            terms.extend(_series_terms(series_list, _get_attr(study, "StudyDate")))
 
     ingest_terms(index_path, _aggregate_terms(terms), embedder)
 
@@ -84,45 +72,80 @@ async def ingest_from_mcp_async(
     study_date: str | None = None,
     max_studies: int | None = None,
     include_series: bool = True,
+    concurrency: int = 8,
 ) -> None:
-    studies = await client.query_studies(study_date=study_date)
+    # Sessions that support it hand back very large listings as streamed records,
+    # which the loops below consume incrementally.
+    stream = {"stream": True} if getattr(client, "streams_large_payloads", False) else {}
+    studies = await client.query_studies(study_date=study_date, **stream)
     if max_studies is not None:
-        studies = list(studies)[:max_studies]
-    terms: list[dict] = []
+        studies = islice(studies, max_studies)
+    per_study: list[list[dict]] = []
+    pending: list[tuple[int, object, object]] = []
     for study in studies:
-        description = _safe_text(_get_attr(study, "StudyDescription"))
-        modality = _normalize_modality(_get_attr(study, "ModalitiesInStudy"))
-        study_date_value = _get_attr(study, "StudyDate")
-        if description:
+        per_study.append(_study_terms(study))
+        if include_series and hasattr(client, "query_series"):
+            study_uid = _get_attr(study, "StudyInstanceUID")
+            if study_uid:
+                pending.append((len(per_study) - 1, study_uid, _get_attr(study, "StudyDate")))
+
+    # Overlap series round trips instead of awaiting each study in turn.
+    call_tools_many = getattr(client, "call_tools_many", None)
+    if call_tools_many is not None:
+        series_results = await call_tools_many(
+            [("query_series", {"study_instance_uid": uid}) for _, uid, _ in pending],
+            max_inflight=concurrency,
+            **stream,
+        )
+        for series_list in series_results:
+            if isinstance(series_list, BaseException):
+                raise series_list
+    else:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _query_series(study_uid: object) -> Iterable[object]:
+            async with semaphore:
+                return await client.query_series(study_instance_uid=study_uid, **stream)
+
+        series_results = await asyncio.gather(*(_query_series(uid) for _, uid, _ in pending))
+    for (position, _, study_date_value), series_list in zip(pending, series_results):
+        per_study[position].extend(_series_terms(series_list, study_date_value))
+    terms = [term for study_terms in per_study for term in study_terms]
+    ingest_terms(index_path, _aggregate_terms(terms), embedder)
+
+
+def _study_terms(study: object) -> list[dict]:
+    description = _safe_text(_get_attr(study, "StudyDescription"))
+    if not description:
+        return []
+    return [
+        {
+            "text": description,
+            "level": "study",
+            "modality": _normalize_modality(_get_attr(study, "ModalitiesInStudy")),
+            "count": 1,
+            "last_seen_date": _get_attr(study, "StudyDate"),
+        }
+    ]
+
+
+def _series_terms(series_list: Iterable[object], study_date_value: object | None) -> list[dict]:
+    terms: list[dict] = []
+    for series in series_list:
+        for field in ["SeriesDescription", "BodyPartExamined", "ProtocolName"]:
+            text = _safe_text(_get_attr(series, field))
+            if not text:
+                continue
             terms.append(
                 {
-                    "text": description,
-                    "level": "study",
-                    "modality": modality,
+                    "text": text,
+                    "level": "series",
+                    "modality": _normalize_modality(_get_attr(series, "Modality")),
                     "count": 1,
                     "last_seen_date": study_date_value,
                 }
             )
-        if include_series and hasattr(client, "query_series"):
-            study_uid = _get_attr(study, "StudyInstanceUID")
-            if not study_uid:
-                continue
-            series_list = await client.query_series(study_instance_uid=study_uid)
-            for series in series_list:
-                for field in ["SeriesDescription", "BodyPartExamined", "ProtocolName"]:
-                    text = _safe_text(_get_attr(series, field))
-                    if not text:
-                        continue
-                    terms.append(
-                        {
-                            "text": text,
-                            "level": "series",
-                            "modality": _normalize_modality(_get_attr(series, "Modality")),
-                            "count": 1,
-                            "last_seen_date": study_date_value,
-                        }
-                    )
-    ingest_terms(index_path, _aggregate_terms(terms), embedder)
+    return terms
 
 
 def _aggregate_terms(terms: list[dict]) -> list[dict]:
@@ -132,19 +155,19 @@ def _aggregate_terms(terms: list[dict]) -> list[dict]:
         text = term.get("text")
         if not text:
             continue
-        key = (text, term.get("level"), _normalize_modality(term.get("modality")))
-        if key not in aggregated:
+        modality = _normalize_modality(term.get("modality"))
+        last_seen_date = _normalize_date(term.get("last_seen_date"))
+        key = (text, term.get("level"), modality)
+        existing = aggregated.get(key)
+        if existing is None:
             normalized = dict(term)
-            normalized["last_seen_date"] = _normalize_date(term.get("last_seen_date"))
-            normalized["modality"] = key[2]
+            normalized["last_seen_date"] = last_seen_date
+            normalized["modality"] = modality
             aggregated[key] = normalized
             continue
-        aggregated[key]["count"] = int(aggregated[key].get("count") or 0) + int(
-            term.get("count") or 0
-        )
-        existing_date = _normalize_date(aggregated[key].get("last_seen_date"))
-        incoming_date = _normalize_date(term.get("last_seen_date"))
-        aggregated[key]["last_seen_date"] = max(existing_date, incoming_date)
+        # Stored dates are already normalized, so max() is a plain string compare.
+        existing["count"] = int(existing.get("count") or 0) + int(term.get("count") or 0)
+        existing["last_seen_date"] = max(existing["last_seen_date"], last_seen_date)
     return list(aggregated.values())
 
 
@@ -157,7 +180,7 @@ def _safe_text(value: object | None) -> str | None:
     # Heuristic PHI filter: drop caret-delimited names and long numeric tokens.
     if "^" in text:
         return None
-    if re.search(r"\b\d{6,}\b", text):
+    if _LONG_NUMBER_RE.search(text):
         return None
     return text
 
@@ -178,7 +201,7 @@ def _normalize_date(value: object | None) -> str:
     text = str(value).strip()
     if text.isdigit() and len(text) == 8:
         return text
-    digits = re.sub(r"\D", "", text)
+    digits = _NON_DIGIT_RE.sub("", text)
     if len(digits) >= 8:
         return digits[:8]
     return text
@@ -3,6 +3,10 @@ from __future__ import annotations
 import re
 from collections import Counter
 from dataclasses import dataclass
+from typing import Iterable
+
+# A term is either plain text or a (text, weight) pair, e.g. (description, count).
+WeightedTerm = str | tuple[str, int]
 
 
 @dataclass(frozen=True)
@@ -10,77 +14,104 @@ class Cluster:
     seed: str
     terms: list[str]
     score: float
+    count: int = 1
+
+
+_TOKEN_RE = re.compile(r"[^a-z0-9]+")
 
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "exam",
+        "for",
+        "from",
+        "in",
+        "of",
+        "on",
+        "or",
+        "study",
+        "the",
+        "to",
+        "with",
+        "without",
+    }
+)
 
-STOPWORDS = {
-    "a",
-    "an",
-    "and",
-    "exam",
-    "for",
-    "from",
-    "in",
-    "of",
-    "on",
-    "or",
-    "study",
-    "the",
-    "to",
-    "with",
-    "without",
-}
-
-
-def suggest_ngrams(terms: list[str], n: int = 2, min_count: int = 2) -> list[dict]:
-    counter: Counter[str] = Counter()
-    for term in terms:
+
+def suggest_ngrams(
+    terms: Iterable[WeightedTerm],
+    n: int = 2,
+    min_count: int = 2,
+) -> list[dict]:
+    # Count token tuples and only join the grams that survive min_count.
+    counter: Counter[tuple[str, ...]] = Counter()
+    for item in terms:
+        term, weight = _weighted(item)
         tokens = _tokenize(term)
         if len(tokens) < n:
             continue
-        for idx in range(len(tokens) - n + 1):
-            gram = " ".join(tokens[idx : idx + n])
-            counter[gram] += 1
+        for gram in zip(*(tokens[offset:] for offset in range(n))):
+            counter[gram] += weight
     return [
-        {"text": text, "count": count}
-        for text, count in counter.most_common()
+        {"text": " ".join(gram), "count": count}
+        for gram, count in counter.most_common()
         if count >= min_count
     ]
 
 
-def cluster_terms(terms: list[str], min_jaccard: float = 0.6) -> list[Cluster]:
+def cluster_terms(terms: Iterable[WeightedTerm], min_jaccard: float = 0.6) -> list[Cluster]:
     clusters: list[Cluster] = []
-    for term in terms:
-        tokens = set(_tokenize(term))
+    seed_tokens: list[frozenset[str]] = []
+    postings: dict[str, list[int]] = {}
+    for item in terms:
+        term, weight = _weighted(item)
+        tokens = frozenset(_tokenize(term))
         if not tokens:
             continue
-        placed = False
-        for cluster in clusters:
-            seed_tokens = set(_tokenize(cluster.seed))
-            score = _jaccard(tokens, seed_tokens)
+        if min_jaccard > 0:
+            # Only clusters sharing a token can reach a positive Jaccard score;
+            # visit them in creation order so the first match still wins.
+            candidates = sorted({idx for token in tokens for idx in postings.get(token, ())})
+        else:
+            candidates = range(len(clusters))
+        for idx in candidates:
+            score = _jaccard(tokens, seed_tokens[idx])
             if score >= min_jaccard:
-                updated_terms = list(cluster.terms) + [term]
-                clusters[clusters.index(cluster)] = Cluster(
+                cluster = clusters[idx]
+                cluster.terms.append(term)
+                clusters[idx] = Cluster(
                     seed=cluster.seed,
-                    terms=updated_terms,
+                    terms=cluster.terms,
                     score=score,
+                    count=cluster.count + weight,
                 )
-                placed = True
                 break
-        if not placed:
-            clusters.append(Cluster(seed=term, terms=[term], score=1.0))
+        else:
+            for token in tokens:
+                postings.setdefault(token, []).append(len(clusters))
+            seed_tokens.append(tokens)
+            clusters.append(Cluster(seed=term, terms=[term], score=1.0, count=weight))
     return clusters
 
 
+def _weighted(item: WeightedTerm) -> tuple[str, int]:
+    if isinstance(item, str):
+        return item, 1
+    text, weight = item
+    return text, int(weight)
+
+
 def _tokenize(text: str) -> list[str]:
-    normalized = re.sub(r"[^a-z0-9]+", " ", text.lower())
     return [
         token
-        for token in normalized.split()
-        if token and token not in STOPWORDS and len(token) >= 2
+        for token in _TOKEN_RE.split(text.lower())
+        if len(token) >= 2 and token not in STOPWORDS
     ]
 
 
-def _jaccard(left: set[str], right: set[str]) -> float:
+def _jaccard(left: frozenset[str], right: frozenset[str]) -> float:
     if not left or not right:
         return 0.0
     return len(left & right) / len(left | right)
@@ -1,24 +1,63 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import itertools
 import json
 import logging
+import random
+import re
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any
 
 from mcp.client.session import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.types import TextContent
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
 
 
 log = logging.getLogger(__name__)
 
+_sleep = asyncio.sleep
+
+# Shared read-only stand-in for omitted arguments; the MCP client copies it into
+# the request model, so no per-call dict is needed.
+_EMPTY_ARGUMENTS: Mapping[str, Any] = MappingProxyType({})
 
-@dataclass(frozen=True)
+# Text blocks above this size that hold a top-level JSON array are decoded lazily.
+_STREAM_JSON_MIN_CHARS = 1_000_000
+_NON_SPACE_RE = re.compile(r"\S")
+
+
+@dataclass(frozen=True, slots=True)
 class McpRetryPolicy:
     timeout_seconds: float = 30.0
     max_attempts: int = 3
     backoff_seconds: tuple[float, ...] = (0.5, 1.0, 2.0)
+    # Each delay is scaled by a random factor in [1 - jitter, 1 + jitter] so
+    # concurrent retries against the same server do not wake in lockstep.
+    backoff_jitter: float = 0.5
     non_idempotent_tools: frozenset[str] = frozenset({"move_study", "move_series"})
+    retryable_exceptions: tuple[type[BaseException], ...] = (
+        asyncio.TimeoutError,
+        TimeoutError,
+        ConnectionError,
+        OSError,
+    )
 
 
 class McpToolExecutionError(RuntimeError):
@@ -38,7 +77,10 @@ def _backoff_for_attempt(attempt: int, policy: McpRetryPolicy) -> float:
     if not policy.backoff_seconds:
         return 0.0
     index = min(attempt - 1, len(policy.backoff_seconds) - 1)
-    return policy.backoff_seconds[index]
+    base = policy.backoff_seconds[index]
+    if base <= 0 or policy.backoff_jitter <= 0:
+        return base
+    return base * random.uniform(1.0 - policy.backoff_jitter, 1.0 + policy.backoff_jitter)
 
 
 def _summarize_payload(payload: Any) -> dict[str, Any] | None:
@@ -69,17 +111,45 @@ def build_stdio_server_params(
 
 
 class McpSession:
+    # Lets callers such as ingest opt into streamed payloads via stream=True.
+    streams_large_payloads = True
+
+    __slots__ = (
+        "_server_params",
+        "_retry_policy",
+        "_stdio_cm",
+        "_session_cm",
+        "_session",
+        "_result_cache",
+        "_cache_ttl",
+        "_cache_size",
+    )
+
     def __init__(
         self,
         server_params: StdioServerParameters,
         retry_policy: McpRetryPolicy | None = None,
+        cache_ttl_seconds: float = 300.0,
+        cache_size: int = 0,
     ) -> None:
         self._server_params = server_params
         self._retry_policy = retry_policy or McpRetryPolicy()
+        # Opt-in cache of idempotent tool results keyed by (name, canonical argument
+        # bytes); values are (stored_at, payload). Off by default (cache_size=0) since
+        # live PACS listings change while a session is open. Callers get copies, so
+        # mutating a result never alters the cached one.
+        self._result_cache: OrderedDict[tuple[str, bytes], tuple[float, Any]] = OrderedDict()
+        self._cache_ttl = cache_ttl_seconds
+        self._cache_size = cache_size
         self._stdio_cm = None
         self._session_cm: ClientSession | None = None
         self._session: ClientSession | None = None
 
+    @classmethod
+    def no_retry(cls, server_params: StdioServerParameters) -> "McpSession":
+        # A single attempt per call; _backoff_for_attempt returns 0 with no backoff steps.
+        return cls(server_params, McpRetryPolicy(max_attempts=1, backoff_seconds=()))
+
     async def __aenter__(self) -> "McpSession":
         self._stdio_cm = stdio_client(self._server_params)
         read_stream, write_stream = await self._stdio_cm.__aenter__()
@@ -96,23 +166,90 @@ class McpSession:
         self._stdio_cm = None
         self._session_cm = None
         self._session = None
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        self._result_cache.clear()
 
-    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        *,
+        stream: bool = False,
+    ) -> Any:
+        # stream=True lets very large JSON array payloads come back as a one-shot
+        # iterator of records; errors while iterating raise McpToolCallError.
         if self._session is None:
             raise RuntimeError("MCP session not initialized")
-        arguments = arguments or {}
+        if not arguments:
+            arguments = _EMPTY_ARGUMENTS
         policy = self._retry_policy
-        max_attempts = policy.max_attempts
-        if name in policy.non_idempotent_tools:
-            max_attempts = 1
+        non_idempotent = name in policy.non_idempotent_tools
 
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return await self._call_tool_once(name, arguments, policy.timeout_seconds)
-            except asyncio.CancelledError:
-                raise
-            except Exception as exc:
-                retryable = _is_retryable(name, exc, policy)
+        cache_key = None
+        if not non_idempotent and self._cache_size > 0:
+            cache_key = (name, _canonical_arguments(arguments))
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                stored_at, payload = cached
+                if time.monotonic() - stored_at < self._cache_ttl:
+                    self._result_cache.move_to_end(cache_key)
+                    return copy.deepcopy(payload)
+                del self._result_cache[cache_key]
+
+        # Most calls succeed on the first attempt, so only set up retries on failure.
+        try:
+            payload, cacheable = await self._call_tool_once(
+                name, arguments, policy.timeout_seconds, stream
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if non_idempotent:
+                # Never retried, so fail on the first error.
+                raise _tool_call_failed(
+                    name=name,
+                    arguments=arguments,
+                    attempt=1,
+                    max_attempts=1,
+                    policy=policy,
+                    retryable=False,
+                    non_idempotent=True,
+                    error=exc,
+                ) from exc
+            payload, cacheable = await self._retry_call(name, arguments, policy, stream, exc)
+        if cache_key is not None and cacheable:
+            self._store_result(cache_key, payload)
+        return payload
+
+    async def _retry_call(
+        self,
+        name: str,
+        arguments: Mapping[str, Any],
+        policy: McpRetryPolicy,
+        stream: bool,
+        error: Exception,
+    ) -> tuple[Any, bool]:
+        max_attempts = policy.max_attempts
+        attempt = 1
+        while True:
+            retryable = _is_retryable(error, policy)
+            if not retryable or attempt >= max_attempts:
+                raise _tool_call_failed(
+                    name=name,
+                    arguments=arguments,
+                    attempt=attempt,
+                    max_attempts=max_attempts,
+                    policy=policy,
+                    retryable=retryable,
+                    non_idempotent=False,
+                    error=error,
+                ) from error
+            backoff_seconds = _backoff_for_attempt(attempt, policy)
+            # Retry details only feed the log record, so skip building them
+            # (sorting argument keys, summarizing payloads) when it is filtered.
+            if log.isEnabledFor(logging.WARNING):
                 details = _build_error_details(
                     name=name,
                     arguments=arguments,
@@ -120,60 +257,220 @@ class McpSession:
                     max_attempts=max_attempts,
                     policy=policy,
                     retryable=retryable,
-                    error=exc,
+                    non_idempotent=False,
+                    error=error,
                 )
-                if not retryable or attempt >= max_attempts:
-                    log.error("MCP tool call failed", extra={"extra_data": details})
-                    raise McpToolCallError("MCP tool call failed", details) from exc
-                backoff_seconds = _backoff_for_attempt(attempt, policy)
-                log.warning(
-                    "MCP tool call failed, retrying",
-                    extra={"extra_data": {**details, "backoff_seconds": backoff_seconds}},
+                details["backoff_seconds"] = backoff_seconds
+                log.warning("MCP tool call failed, retrying", extra={"extra_data": details})
+            if backoff_seconds > 0:
+                await _sleep(backoff_seconds)
+            attempt += 1
+            try:
+                return await self._call_tool_once(
+                    name, arguments, policy.timeout_seconds, stream
                 )
-                if backoff_seconds > 0:
-                    await asyncio.sleep(backoff_seconds)
-        raise RuntimeError("MCP tool call retry loop exited unexpectedly")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                error = exc
+
+    async def call_tools_many(
+        self,
+        calls: list[tuple[str, dict[str, Any] | None]],
+        max_inflight: int = 16,
+        *,
+        stream: bool = False,
+    ) -> list[Any]:
+        # Keep up to max_inflight requests on the wire; results follow call order and
+        # failures are returned in place so one bad call does not drop the batch.
+        semaphore = asyncio.Semaphore(max_inflight)
+
+        async def _one(name: str, arguments: dict[str, Any] | None) -> Any:
+            async with semaphore:
+                return await self.call_tool(name, arguments, stream=stream)
+
+        return await asyncio.gather(
+            *(_one(name, arguments) for name, arguments in calls),
+            return_exceptions=True,
+        )
 
     async def _call_tool_once(
         self,
         name: str,
-        arguments: dict[str, Any],
+        arguments: Mapping[str, Any],
         timeout_seconds: float,
-    ) -> Any:
+        stream: bool = False,
+    ) -> tuple[Any, bool]:
         if self._session is None:
             raise RuntimeError("MCP session not initialized")
-        call = self._session.call_tool(name=name, arguments=arguments)
-        result = await asyncio.wait_for(call, timeout=timeout_seconds)
-        payload = _extract_tool_payload(result)
+        async with asyncio.timeout(timeout_seconds):
+            result = await self._session.call_tool(name=name, arguments=arguments)
+        payload = _extract_tool_payload(result, stream=stream)
+        if isinstance(payload, Iterator):
+            payload = _guard_stream(name, payload)
         if result.isError:
             raise McpToolExecutionError(name, payload)
-        return payload
+        return payload, _is_cacheable(result, payload)
 
-    async def query_studies(self, **kwargs) -> Any:
-        return await self.call_tool("query_studies", kwargs)
+    def _store_result(self, key: tuple[str, bytes], payload: Any) -> None:
+        self._result_cache[key] = (time.monotonic(), copy.deepcopy(payload))
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self._cache_size:
+            self._result_cache.popitem(last=False)
 
-    async def query_series(self, **kwargs) -> Any:
-        return await self.call_tool("query_series", kwargs)
+    async def query_studies(self, *, stream: bool = False, **kwargs) -> Any:
+        return await self.call_tool("query_studies", kwargs, stream=stream)
 
+    async def query_series(self, *, stream: bool = False, **kwargs) -> Any:
+        return await self.call_tool("query_series", kwargs, stream=stream)
 
-def _is_retryable(tool: str, error: BaseException, policy: McpRetryPolicy) -> bool:
-    if tool in policy.non_idempotent_tools:
-        return False
+
+# Warm sessions shared by callers in the same event loop, keyed by loop, server
+# parameters and retry policy. Spawning the server and running initialize() is
+# far more expensive than a tool call, so repeat callers should reuse sessions.
+_SESSION_POOL: dict[tuple, _PooledSession] = {}
+_POOL_LOCKS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@dataclass(slots=True)
+class _PooledSession:
+    session: McpSession
+    # The stdio transport must be exited by the task that entered it, so each pooled
+    # session is owned by a long-lived task that opens it and closes it on `stop`.
+    owner: asyncio.Task[None]
+    stop: asyncio.Event
+
+
+async def acquire_session(
+    server_params: StdioServerParameters,
+    retry_policy: McpRetryPolicy | None = None,
+) -> McpSession:
+    loop = asyncio.get_running_loop()
+    policy = retry_policy or McpRetryPolicy()
+    key = (loop, _server_params_key(server_params), policy)
+    lock = _POOL_LOCKS.setdefault(loop, asyncio.Lock())
+    async with lock:
+        entry = _SESSION_POOL.get(key)
+        if entry is not None:
+            if not entry.owner.done() and entry.session._session is not None:
+                return entry.session
+            del _SESSION_POOL[key]
+        session = McpSession(server_params, retry_policy=policy)
+        ready: asyncio.Future[None] = loop.create_future()
+        stop = asyncio.Event()
+        owner = loop.create_task(_own_session(session, ready, stop))
+        try:
+            await ready
+        except asyncio.CancelledError:
+            # The caller gave up; let the owner close the session once it is open.
+            stop.set()
+            raise
+        _SESSION_POOL[key] = _PooledSession(session=session, owner=owner, stop=stop)
+        return session
+
+
+async def shutdown_pool() -> None:
+    # Safe from any task in the loop: each owner task exits its own session. Entries
+    # are dropped only once their session has closed.
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _SESSION_POOL if key[0] is loop]:
+        entry = _SESSION_POOL[key]
+        entry.stop.set()
+        await entry.owner
+        del _SESSION_POOL[key]
+
+
+async def _own_session(
+    session: McpSession,
+    ready: asyncio.Future[None],
+    stop: asyncio.Event,
+) -> None:
+    try:
+        await session.__aenter__()
+    except BaseException as exc:
+        if not ready.done():
+            ready.set_exception(exc)
+        return
+    try:
+        if not ready.done():
+            ready.set_result(None)
+        await stop.wait()
+    finally:
+        await session.__aexit__(None, None, None)
+
+
+def _server_params_key(server_params: StdioServerParameters) -> tuple:
+    return (
+        server_params.command,
+        tuple(server_params.args),
+        str(server_params.cwd) if server_params.cwd is not None else None,
+        tuple(sorted((server_params.env or {}).items())),
+    )
+
+
+def _is_retryable(error: BaseException, policy: McpRetryPolicy) -> bool:
+    # Callers only ask for idempotent tools; non-idempotent ones never retry.
     if isinstance(error, McpToolExecutionError):
         return False
-    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError, OSError)):
-        return True
-    return False
+    return isinstance(error, policy.retryable_exceptions)
+
+
+def _tool_call_failed(
+    *,
+    name: str,
+    arguments: Mapping[str, Any],
+    attempt: int,
+    max_attempts: int,
+    policy: McpRetryPolicy,
+    retryable: bool,
+    non_idempotent: bool,
+    error: BaseException,
+) -> McpToolCallError:
+    details = _build_error_details(
+        name=name,
+        arguments=arguments,
+        attempt=attempt,
+        max_attempts=max_attempts,
+        policy=policy,
+        retryable=retryable,
+        non_idempotent=non_idempotent,
+        error=error,
+    )
+    log.error("MCP tool call failed", extra={"extra_data": details})
+    return McpToolCallError("MCP tool call failed", details)
+
+
+def _canonical_arguments(arguments: Mapping[str, Any]) -> bytes:
+    # Sorted-key JSON bytes hash in one pass and match the wire encoding of the call.
+    if not arguments:
+        return b"{}"
+    if orjson is not None:
+        return orjson.dumps(
+            arguments, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        )
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def _is_cacheable(result, payload: Any) -> bool:
+    # Streamed payloads can only be consumed once.
+    if isinstance(payload, Iterator):
+        return False
+    # Servers can opt a response out of client caching via _meta.cache_hint.
+    meta = getattr(result, "meta", None)
+    return not (isinstance(meta, dict) and meta.get("cache_hint") == "no-cache")
 
 
 def _build_error_details(
     *,
     name: str,
-    arguments: dict[str, Any],
+    arguments: Mapping[str, Any],
     attempt: int,
     max_attempts: int,
     policy: McpRetryPolicy,
     retryable: bool,
+    non_idempotent: bool,
     error: BaseException,
 ) -> dict[str, Any]:
     payload_summary = None
@@ -189,26 +486,87 @@ def _build_error_details(
         "error_message": str(error),
         "argument_keys": sorted(arguments.keys()),
         "payload_summary": payload_summary,
-        "non_idempotent": name in policy.non_idempotent_tools,
+        "non_idempotent": non_idempotent,
     }
 
 
-def _extract_tool_payload(result) -> Any:
+def _extract_tool_payload(result, stream: bool = False) -> Any:
     if result.structuredContent is not None:
-        payload = result.structuredContent
-        if isinstance(payload, dict) and set(payload.keys()) == {"result"}:
-            return payload["result"]
-        return payload
+        return _unwrap_result(result.structuredContent)
     for block in result.content:
-        if getattr(block, "type", None) == "text":
-            text = block.text.strip()
-            if not text:
+        if isinstance(block, TextContent):
+            text = block.text
+            first = _NON_SPACE_RE.search(text)
+            if first is None:
                 continue
+            if (
+                stream
+                and ijson is not None
+                and len(text) > _STREAM_JSON_MIN_CHARS
+                and text[first.start()] == "["
+            ):
+                # Yield records one by one instead of building the whole list up front.
+                records = ijson.items(_Utf8Reader(text), "item", use_float=True)
+                try:
+                    head = next(records)
+                except StopIteration:
+                    return []
+                except ijson.JSONError:
+                    # Not a JSON array after all (e.g. "[WARN] ..."): decode as below.
+                    pass
+                else:
+                    return itertools.chain((head,), records)
+            text = text.strip()
             try:
-                payload = json.loads(text)
-                if isinstance(payload, dict) and set(payload.keys()) == {"result"}:
-                    return payload["result"]
-                return payload
+                payload = _loads_json(text)
             except json.JSONDecodeError:
                 return text
+            return _unwrap_result(payload)
     return None
+
+
+def _guard_stream(name: str, records: Iterator[Any]) -> Iterator[Any]:
+    try:
+        yield from records
+    except ijson.JSONError as exc:
+        details = {
+            "tool": name,
+            "error_type": type(exc).__name__,
+            "error_message": str(exc),
+            "streamed": True,
+        }
+        log.error("MCP tool payload stream failed", extra={"extra_data": details})
+        raise McpToolCallError("MCP tool payload stream failed", details) from exc
+
+
+def _unwrap_result(payload: Any) -> Any:
+    # Tools wrap list results as {"result": [...]}; hand back the inner value.
+    if isinstance(payload, dict) and len(payload) == 1 and "result" in payload:
+        return payload["result"]
+    return payload
+
+
+def _loads_json(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which Python servers emit via json.dumps.
+            pass
+    return json.loads(text)
+
+
+class _Utf8Reader:
+    """Binary file-like view over a str, encoding one chunk per read for ijson."""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self._text) - self._offset
+        chunk = self._text[self._offset : self._offset + size]
+        self._offset += len(chunk)
+        return chunk.encode("utf-8")
@@ -1,9 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+from collections import OrderedDict
+import os
+import threading
 from typing import Iterable
+import weakref
 
 from .embedder import EmbeddingProvider
-from .index import SqliteIndex, Suggestion
+from .index import SqliteIndex, Suggestion, _file_id, _file_signature
+
+# Open indexes reused across retrieve() calls so repeat queries skip connect and
+# schema checks; keyed by absolute path and reopened when the file is replaced.
+# Each thread keeps its own indexes, so concurrent queries never queue on one
+# connection and an index is only ever closed by the thread that uses it.
+_INDEX_CACHE = threading.local()
+_INDEX_CACHE_SIZE = 32
+# Every index opened through the cache by any thread, closed together at exit.
+_OPEN_INDEXES: weakref.WeakSet[SqliteIndex] = weakref.WeakSet()
+_OPEN_INDEXES_LOCK = threading.Lock()
+
+# Recent answers keyed by (index_path, file signature, query, top_k, min_score,
+# embedder key); the signature drops entries once the database files change.
+# Providers can supply a `cache_key`; dataclass providers are keyed by their repr.
+_RESULT_CACHE: OrderedDict[tuple, list[Suggestion]] = OrderedDict()
+_RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE_LOCK = threading.Lock()
 
 
 def retrieve(
@@ -13,10 +36,179 @@ def retrieve(
     min_score: float = 0.2,
     embedder: EmbeddingProvider | None = None,
 ) -> list[Suggestion]:
-    if not query:
+    if not query or query.isspace():
         return []
     if embedder is None:
         raise ValueError("embedder is required")
+    index_path = _cache_path(index_path)
+    # Open first: connecting can create the -wal file and change the signature.
+    index = _get_index(index_path)
+    signature = _file_signature(index_path)
+    embedder_key = _embedder_cache_key(embedder)
+    key = None
+    if signature is not None and embedder_key is not None:
+        # Interactive sessions repeat queries constantly; serve those from memory.
+        key = (index_path, signature, query, top_k, min_score, embedder_key)
+        with _RESULT_CACHE_LOCK:
+            cached = _RESULT_CACHE.get(key)
+            if cached is not None:
+                _RESULT_CACHE.move_to_end(key)
+                return list(cached)
+    # Providers written against the older protocol may only implement embed().
+    embed_one = getattr(embedder, "embed_one", None)
+    vector = embed_one(query) if embed_one is not None else embedder.embed([query])[0]
+    suggestions = index.retrieve(vector, top_k=top_k, min_score=min_score)
+    if key is not None:
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE[key] = suggestions
+            while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+                _RESULT_CACHE.popitem(last=False)
+    return list(suggestions)
+
+
+def _embedder_cache_key(embedder: EmbeddingProvider) -> object | None:
+    key = getattr(embedder, "cache_key", None)
+    if key is not None:
+        return key
+    # The default repr embeds a memory address that can be reused by another
+    # provider after garbage collection, so such providers are never cached.
+    if type(embedder).__repr__ is object.__repr__:
+        return None
+    return repr(embedder)
+
+
+def retrieve_cache_clear() -> None:
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE.clear()
+
+
+def retrieve_many(
+    index_path: str,
+    queries: list[str],
+    top_k: int = 10,
+    min_score: float = 0.2,
+    embedder: EmbeddingProvider | None = None,
+) -> list[list[Suggestion]]:
+    if embedder is None:
+        raise ValueError("embedder is required")
+    results: list[list[Suggestion]] = [[] for _ in queries]
+    positions = [
+        position for position, query in enumerate(queries) if query and not query.isspace()
+    ]
+    if not positions:
+        return results
+    # One embed call for the whole batch; empty queries keep their empty slot.
+    vectors = embedder.embed([queries[position] for position in positions])
+    index = _get_index(index_path)
+    for position, vector in zip(positions, vectors):
+        results[position] = index.retrieve(vector, top_k=top_k, min_score=min_score)
+    return results
+
+
+# Coalesces concurrent async queries: those arriving within window_seconds of the
+# first pending one (or until max_batch) share one retrieve_many call, which runs in
+# a worker thread so slow embedders do not block the event loop. Batches may overlap;
+# each worker thread queries through its own cached index.
+class RetrieveBatcher:
+    def __init__(
+        self,
+        index_path: str,
+        embedder: EmbeddingProvider,
+        top_k: int = 10,
+        min_score: float = 0.2,
+        window_seconds: float = 0.002,
+        max_batch: int = 64,
+    ) -> None:
+        self.index_path = index_path
+        self.embedder = embedder
+        self.top_k = top_k
+        self.min_score = min_score
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._pending: list[tuple[str, asyncio.Future[list[Suggestion]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def retrieve(self, query: str) -> list[Suggestion]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[Suggestion]] = loop.create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            # Hold a reference until the task finishes so it is not collected early.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[list[Suggestion]]]]) -> None:
+        try:
+            results = await asyncio.to_thread(
+                retrieve_many,
+                self.index_path,
+                [query for query, _ in batch],
+                top_k=self.top_k,
+                min_score=self.min_score,
+                embedder=self.embedder,
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), suggestions in zip(batch, results):
+            if not future.done():
+                future.set_result(suggestions)
+
+
+def _get_index(index_path: str) -> SqliteIndex:
+    index_path = _cache_path(index_path)
+    cache = _thread_indexes()
+    index = cache.get(index_path)
+    if index is not None:
+        if index.file_id == _file_id(index_path):
+            cache.move_to_end(index_path)
+            return index
+        # Deleted or replaced since it was opened: the connection reads the old file.
+        del cache[index_path]
+        index.close()
     index = SqliteIndex(index_path)
-    vectors = embedder.embed([query])
-    return index.retrieve(vectors[0], top_k=top_k, min_score=min_score)
+    cache[index_path] = index
+    with _OPEN_INDEXES_LOCK:
+        _OPEN_INDEXES.add(index)
+    while len(cache) > _INDEX_CACHE_SIZE:
+        _, evicted = cache.popitem(last=False)
+        evicted.close()
+    return index
+
+
+def _thread_indexes() -> OrderedDict[str, SqliteIndex]:
+    cache = getattr(_INDEX_CACHE, "indexes", None)
+    if cache is None:
+        cache = _INDEX_CACHE.indexes = OrderedDict()
+    return cache
+
+
+def _cache_path(index_path: str) -> str:
+    if index_path == ":memory:" or index_path.startswith("file:"):
+        return index_path
+    return os.path.abspath(index_path)
+
+
+@atexit.register
+def _close_indexes() -> None:
+    _thread_indexes().clear()
+    with _OPEN_INDEXES_LOCK:
+        indexes = list(_OPEN_INDEXES)
+        _OPEN_INDEXES.clear()
+    for index in indexes:
+        index.close()
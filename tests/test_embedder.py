@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from urllib import error
+
+import numpy as np
+
+from pacs_rag import embedder as embedder_module
+from pacs_rag.embedder import HashEmbeddingProvider, OllamaEmbeddingProvider, build_embedder
+from pacs_rag.ingest import ingest_terms
+
+
+class FakeResponse(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def test_hash_embed_keeps_md5_buckets() -> None:
+    # Stored indexes depend on these buckets; changing the hash breaks retrieval.
+    vectors = HashEmbeddingProvider(dim=16).embed(["CT cranial cranial", ""])
+
+    expected = np.zeros(16, dtype=np.float32)
+    for token in ["ct", "cranial", "cranial"]:
+        digest = hashlib.md5(token.encode("utf-8")).digest()
+        expected[int.from_bytes(digest[:4], "little") % 16] += 1.0
+    expected /= np.linalg.norm(expected)
+
+    assert vectors.shape == (2, 16)
+    assert np.allclose(vectors[0], expected)
+    assert not vectors[1].any()
+
+
+def test_hash_embed_parallel_matches_serial() -> None:
+    texts = [f"MR series {idx % 97} axial t{idx % 3}" for idx in range(9000)]
+
+    serial = HashEmbeddingProvider(dim=32).embed(texts)
+    with HashEmbeddingProvider(dim=32, workers=2) as provider:
+        parallel = provider.embed(texts)
+        pool = provider._pool
+        again = provider.embed(texts)
+        # Later batches reuse the worker processes started by the first one.
+        assert provider._pool is pool
+
+    assert np.array_equal(serial, parallel)
+    assert np.array_equal(serial, again)
+    assert provider._pool is None
+
+
+def test_hash_embed_one_matches_batch_row() -> None:
+    provider = HashEmbeddingProvider(dim=16)
+    texts = ["CT cranial cranial", "MR fetal study", ""]
+
+    batch = provider.embed(texts)
+
+    for text, row in zip(texts, batch):
+        single = provider.embed_one(text)
+        assert single.shape == (16,)
+        assert np.array_equal(single, row)
+
+
+def test_ollama_embed_batches_requests(monkeypatch) -> None:
+    calls: list[tuple[str, dict]] = []
+
+    def fake_urlopen(req, timeout):
+        payload = json.loads(req.data.decode("utf-8"))
+        calls.append((req.full_url, payload))
+        body = {"embeddings": [[float(len(text))] for text in payload["input"]]}
+        return FakeResponse(json.dumps(body).encode("utf-8"))
+
+    monkeypatch.setattr(embedder_module.request, "urlopen", fake_urlopen)
+    provider = OllamaEmbeddingProvider(base_url="http://ollama/", model="m", batch_size=2)
+
+    vectors = provider.embed(["a", "bb", "ccc"])
+
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert [url for url, _ in calls] == ["http://ollama/api/embed"] * 2
+
+
+def test_ollama_embed_falls_back_to_single_prompt_endpoint(monkeypatch) -> None:
+    urls: list[str] = []
+
+    def fake_urlopen(req, timeout):
+        urls.append(req.full_url)
+        if req.full_url.endswith("/api/embed"):
+            raise error.HTTPError(req.full_url, 404, "not found", None, None)
+        payload = json.loads(req.data.decode("utf-8"))
+        body = {"embedding": [float(len(payload["prompt"]))]}
+        return FakeResponse(json.dumps(body).encode("utf-8"))
+
+    monkeypatch.setattr(embedder_module.request, "urlopen", fake_urlopen)
+    provider = OllamaEmbeddingProvider(base_url="http://ollama", model="m", batch_size=2)
+
+    vectors = provider.embed(["a", "bb", "ccc"])
+
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert urls.count("http://ollama/api/embed") == 1
+
+
+def test_ingest_chunks_reach_the_parallel_threshold(tmp_path) -> None:
+    parallel_batches: list[int] = []
+
+    class TrackingProvider(HashEmbeddingProvider):
+        def _embed_parallel(self, texts):
+            parallel_batches.append(len(texts))
+            return super()._embed_parallel(texts)
+
+    terms = ({"text": f"MR series {idx}"} for idx in range(9000))
+    with TrackingProvider(dim=8, workers=2) as provider:
+        ingest_terms(str(tmp_path / "terms.sqlite"), terms, provider)
+
+    assert parallel_batches == [8192]
+    assert HashEmbeddingProvider(dim=8).ingest_chunk_size is None
+    assert build_embedder("hash", None, None, 8, workers=3) == HashEmbeddingProvider(8, 3)
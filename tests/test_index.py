@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+
+import numpy as np
+import pytest
+
+from pacs_rag import index as index_module
+from pacs_rag.embedder import HashEmbeddingProvider
+from pacs_rag.index import SqliteIndex
+
+
+def test_upsert_terms_keeps_highest_count(tmp_path) -> None:
+    term = {"text": "MR fetal", "level": "study", "modality": "MR"}
+    with SqliteIndex(str(tmp_path / "terms.sqlite")) as index:
+        index.upsert_terms([{**term, "count": 5}], [[1.0, 0.0]])
+        index.upsert_terms([{**term, "count": 2, "last_seen_date": "20240301"}], [[0.0, 1.0]])
+        top = index.top_terms(min_count=1)
+
+    assert top == [
+        {
+            "text": "MR fetal",
+            "level": "study",
+            "modality": "MR",
+            "count": 5,
+            "last_seen_date": "20240301",
+        }
+    ]
+
+
+def test_top_terms_uses_count_index(tmp_path) -> None:
+    with SqliteIndex(str(tmp_path / "terms.sqlite")) as index:
+        plan = index._conn.execute(
+            """
+            EXPLAIN QUERY PLAN
+            SELECT text, level, modality, count, last_seen_date
+            FROM terms
+            WHERE count >= ?
+            ORDER BY count DESC, text ASC
+            LIMIT ?
+            """,
+            (1, 10),
+        ).fetchall()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_terms_count_text" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_int8_quantized_retrieve_matches_float_ranking(tmp_path) -> None:
+    pytest.importorskip("simsimd")
+    path = str(tmp_path / "terms.sqlite")
+    embedder = HashEmbeddingProvider(dim=32)
+    texts = ["MR fetal brain", "MR fetal", "CT cranial", "CT chest abdomen", "US fetal"]
+    query = embedder.embed(["mr fetal"])[0]
+    with SqliteIndex(path) as index:
+        index.upsert_terms([{"text": text} for text in texts], embedder.embed(texts))
+        exact = index.retrieve(query, top_k=5, min_score=0.0)
+    with SqliteIndex(path, quantize="int8") as index:
+        approx = index.retrieve(query, top_k=5, min_score=0.0)
+
+    assert [item.text for item in approx] == [item.text for item in exact]
+    for left, right in zip(exact, approx):
+        assert abs(left.score - right.score) < 0.02
+
+
+def test_streaming_retrieve_matches_cached_retrieve(tmp_path) -> None:
+    path = str(tmp_path / "terms.sqlite")
+    embedder = HashEmbeddingProvider(dim=32)
+    texts = ["MR fetal brain", "MR fetal", "CT cranial", "CT chest abdomen", "US fetal"]
+    query = embedder.embed(["mr fetal"])[0]
+    with SqliteIndex(path) as index:
+        index.upsert_terms(
+            [{"text": text, "level": "study", "count": 2} for text in texts],
+            embedder.embed(texts),
+        )
+        cached = index.retrieve(query, top_k=3, min_score=0.1)
+    with SqliteIndex(path, cache_vectors=False) as index:
+        streamed = index.retrieve(query, top_k=3, min_score=0.1)
+
+    assert [(item.text, item.level, item.count) for item in streamed] == [
+        (item.text, item.level, item.count) for item in cached
+    ]
+    for left, right in zip(cached, streamed):
+        assert abs(left.score - right.score) < 1e-6
+
+
+def test_vectors_are_stored_as_float32_blobs(tmp_path) -> None:
+    path = tmp_path / "terms.sqlite"
+    with SqliteIndex(str(path)) as index:
+        index.upsert_terms([{"text": "MR fetal"}], [[3.0, 0.0, 4.0]])
+
+    with sqlite3.connect(path) as conn:
+        kind, blob = conn.execute("SELECT typeof(vector), vector FROM terms").fetchone()
+
+    assert kind == "blob"
+    assert len(blob) == 3 * 4
+    assert np.allclose(np.frombuffer(blob, dtype=np.float32), [0.6, 0.0, 0.8])
+
+
+def test_matrix_cache_is_shared_and_invalidated(tmp_path) -> None:
+    path = str(tmp_path / "terms.sqlite")
+    with SqliteIndex(path) as writer:
+        writer.upsert_terms([{"text": "MR fetal"}], [[1.0, 0.0]])
+
+    with SqliteIndex(path) as first, SqliteIndex(path) as second:
+        assert first._load_cache() is second._load_cache()
+
+    with SqliteIndex(path) as writer:
+        writer.upsert_terms([{"text": "CT cranial"}], [[0.0, 1.0]])
+    with SqliteIndex(path) as reader:
+        results = reader.retrieve([0.0, 1.0], top_k=1, min_score=0.5)
+
+    assert [item.text for item in results] == ["CT cranial"]
+
+
+def test_tied_scores_keep_insertion_order_at_top_k_cutoff(tmp_path) -> None:
+    terms = [{"text": f"t{idx:04d}"} for idx in range(1000)]
+    vectors = [[0.0, 1.0] if idx % 7 == 0 else [1.0, 0.0] for idx in range(1000)]
+    path = str(tmp_path / "terms.sqlite")
+    with SqliteIndex(path) as index:
+        index.upsert_terms(terms, vectors)
+        cached = index.retrieve([1.0, 0.0], top_k=5, min_score=0.0)
+    with SqliteIndex(path, cache_vectors=False) as index:
+        streamed = index.retrieve([1.0, 0.0], top_k=5, min_score=0.0)
+
+    expected = ["t0001", "t0002", "t0003", "t0004", "t0005"]
+    assert [item.text for item in cached] == expected
+    assert [item.text for item in streamed] == expected
+
+
+@pytest.mark.skipif(index_module.simsimd is None, reason="simsimd not installed")
+def test_simsimd_dot_udf_matches_numpy() -> None:
+    rng = np.random.default_rng(0)
+    left, right = rng.standard_normal((2, 64)).astype(np.float32)
+
+    expected = index_module._dot_blobs(left.tobytes(), right.tobytes())
+    actual = index_module._dot_blobs_simsimd(left.tobytes(), right.tobytes())
+
+    assert abs(actual - expected) < 1e-4
+
+
+def test_shared_index_reads_whole_matrix_from_many_threads(tmp_path) -> None:
+    path = str(tmp_path / "terms.sqlite")
+    embedder = HashEmbeddingProvider(dim=16)
+    texts = [f"MR series {idx}" for idx in range(5000)]
+    with SqliteIndex(path) as index:
+        index.upsert_terms([{"text": text} for text in texts], embedder.embed(texts))
+        query = embedder.embed(["mr series"])[0]
+
+        def _read() -> list[int]:
+            sizes = []
+            for _ in range(20):
+                index_module._invalidate_matrix(path)
+                sizes.append(len(index.retrieve(query, top_k=len(texts), min_score=-1.0)))
+            return sizes
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            sizes = [size for batch in pool.map(lambda _: _read(), range(8)) for size in batch]
+
+    assert sizes == [len(texts)] * 160
+
+
+def test_streaming_retrieve_scores_each_row_once(tmp_path, monkeypatch) -> None:
+    calls: list[int] = []
+    dot = index_module._dot_blobs
+
+    def _counting_dot(left: bytes, right: bytes) -> float:
+        calls.append(1)
+        return dot(left, right)
+
+    monkeypatch.setattr(index_module, "_dot_blobs", _counting_dot)
+    monkeypatch.setattr(index_module, "_dot_blobs_simsimd", _counting_dot)
+    path = str(tmp_path / "terms.sqlite")
+    embedder = HashEmbeddingProvider(dim=16)
+    texts = [f"MR series {idx}" for idx in range(200)]
+    with SqliteIndex(path, cache_vectors=False) as index:
+        index.upsert_terms([{"text": text} for text in texts], embedder.embed(texts))
+        results = index.retrieve(embedder.embed(["mr series"])[0], top_k=5, min_score=-1.0)
+
+    assert len(results) == 5
+    assert len(calls) == len(texts)
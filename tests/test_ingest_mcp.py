@@ -35,3 +35,68 @@ def test_ingest_from_mcp_async_respects_max_studies(tmp_path) -> None:
     index = SqliteIndex(str(index_path))
     top = index.top_terms(min_count=1, limit=10)
     assert len(top) == 1
+
+
+class ConcurrentSeriesClient:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def query_studies(self, **kwargs):
+        return [
+            {"StudyInstanceUID": str(idx), "StudyDescription": f"Study {idx}"}
+            for idx in range(6)
+        ]
+
+    async def query_series(self, study_instance_uid: str, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [{"SeriesDescription": f"Series {study_instance_uid}", "Modality": "MR"}]
+
+
+def test_ingest_from_mcp_async_queries_series_concurrently(tmp_path) -> None:
+    index_path = tmp_path / "terms.sqlite"
+    client = ConcurrentSeriesClient()
+
+    asyncio.run(
+        ingest_from_mcp_async(
+            client,
+            index_path=str(index_path),
+            embedder=HashEmbeddingProvider(dim=8),
+            concurrency=3,
+        )
+    )
+
+    assert client.max_in_flight == 3
+    index = SqliteIndex(str(index_path))
+    texts = {term["text"] for term in index.top_terms(min_count=1, limit=20)}
+    assert texts == {f"Study {idx}" for idx in range(6)} | {f"Series {idx}" for idx in range(6)}
+
+
+class BatchingClient(ConcurrentSeriesClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[tuple[str, dict]]] = []
+
+    async def call_tools_many(self, calls, max_inflight=16):
+        self.batches.append(calls)
+        return [await self.query_series(**arguments) for _, arguments in calls]
+
+
+def test_ingest_from_mcp_async_batches_series_calls(tmp_path) -> None:
+    index_path = tmp_path / "terms.sqlite"
+    client = BatchingClient()
+
+    asyncio.run(
+        ingest_from_mcp_async(
+            client,
+            index_path=str(index_path),
+            embedder=HashEmbeddingProvider(dim=8),
+        )
+    )
+
+    assert [len(batch) for batch in client.batches] == [6]
+    index = SqliteIndex(str(index_path))
+    assert len(index.top_terms(min_count=1, limit=20)) == 12
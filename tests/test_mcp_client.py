@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import sys
+
+import pytest
+from mcp.types import CallToolResult, ImageContent, TextContent
+
+from pacs_rag import mcp_client
+from pacs_rag.mcp_client import (
+    McpSession,
+    McpToolCallError,
+    _extract_tool_payload,
+    acquire_session,
+    build_stdio_server_params,
+    shutdown_pool,
+)
+
+
+def _text_result(*texts: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text) for text in texts])
+
+
+def test_extract_tool_payload_decodes_json_text() -> None:
+    result = _text_result('  {"result": [{"StudyDescription": "MR fetal"}]}\n')
+
+    assert _extract_tool_payload(result) == [{"StudyDescription": "MR fetal"}]
+
+
+def test_extract_tool_payload_accepts_non_finite_numbers() -> None:
+    result = _text_result('{"result": [{"x": NaN, "StudyDescription": "MR"}]}')
+
+    payload = _extract_tool_payload(result)
+
+    assert isinstance(payload, list)
+    assert payload[0]["StudyDescription"] == "MR"
+    assert math.isnan(payload[0]["x"])
+
+def test_extract_tool_payload_skips_blank_and_non_text_blocks() -> None:
+    result = CallToolResult(
+        content=[
+            ImageContent(type="image", data="", mimeType="image/png"),
+            TextContent(type="text", text="   "),
+            TextContent(type="text", text=" not json "),
+        ]
+    )
+
+    assert _extract_tool_payload(result) == "not json"
+
+
+class CountingSession:
+    def __init__(self, meta: dict | None = None) -> None:
+        self.calls: list[tuple[str, dict]] = []
+        self._meta = meta
+
+    async def call_tool(self, name: str, arguments: dict[str, object]) -> CallToolResult:
+        self.calls.append((name, arguments))
+        return CallToolResult(
+            content=[],
+            structuredContent={"result": [len(self.calls)]},
+            _meta=self._meta,
+        )
+
+
+def _client(session: CountingSession, **kwargs) -> McpSession:
+    kwargs.setdefault("cache_size", 256)
+    client = McpSession(build_stdio_server_params("dicom-mcp"), **kwargs)
+    client._session = session
+    return client
+
+
+def test_call_tool_caches_idempotent_results() -> None:
+    session = CountingSession()
+    client = _client(session)
+
+    async def _calls() -> list[object]:
+        return [
+            await client.call_tool("query_series", {"study_instance_uid": "1", "fields": ["a"]}),
+            await client.call_tool("query_series", {"fields": ["a"], "study_instance_uid": "1"}),
+            await client.call_tool("query_series", {"study_instance_uid": "2"}),
+            await client.call_tool("move_study", {"study_instance_uid": "1"}),
+            await client.call_tool("move_study", {"study_instance_uid": "1"}),
+        ]
+
+    assert asyncio.run(_calls()) == [[1], [1], [2], [3], [4]]
+    client.clear_cache()
+    assert asyncio.run(client.call_tool("query_series", {"study_instance_uid": "2"})) == [5]
+
+
+def test_call_tool_cache_is_opt_in_and_returns_copies() -> None:
+    session = CountingSession()
+    client = _client(session, cache_size=0)
+    asyncio.run(client.call_tool("query_studies", {}))
+    asyncio.run(client.call_tool("query_studies", {}))
+    assert len(session.calls) == 2
+
+    client = _client(CountingSession())
+
+    async def _calls() -> list[object]:
+        first = await client.call_tool("query_studies", {})
+        first.append("injected")
+        second = await client.call_tool("query_studies", {})
+        second.append("injected")
+        return [first, second, await client.call_tool("query_studies", {})]
+
+    assert asyncio.run(_calls()) == [[1, "injected"], [1, "injected"], [1]]
+
+
+def test_call_tool_cache_respects_no_cache_hint_and_size() -> None:
+    session = CountingSession(meta={"cache_hint": "no-cache"})
+    client = _client(session)
+    asyncio.run(client.call_tool("query_studies", {}))
+    asyncio.run(client.call_tool("query_studies", {}))
+    assert len(session.calls) == 2
+
+    session = CountingSession()
+    client = _client(session, cache_size=1)
+
+    async def _calls() -> None:
+        for study_date in ["20240101", "20240102", "20240101"]:
+            await client.call_tool("query_studies", {"study_date": study_date})
+
+    asyncio.run(_calls())
+    assert len(session.calls) == 3
+
+
+def test_acquire_session_reuses_live_sessions(monkeypatch) -> None:
+    entered: list[McpSession] = []
+
+    async def _fake_enter(self):
+        entered.append(self)
+        self._session = CountingSession()
+        return self
+
+    async def _fake_exit(self, exc_type, exc, tb):
+        self._session = None
+
+    monkeypatch.setattr(McpSession, "__aenter__", _fake_enter)
+    monkeypatch.setattr(McpSession, "__aexit__", _fake_exit)
+
+    async def _scenario() -> None:
+        params = build_stdio_server_params("dicom-mcp", args=["--config", "a.yaml"])
+        same_params = build_stdio_server_params("dicom-mcp", args=["--config", "a.yaml"])
+        other_params = build_stdio_server_params("dicom-mcp", args=["--config", "b.yaml"])
+        first = await acquire_session(params)
+        again = await acquire_session(same_params)
+        other = await acquire_session(other_params)
+        assert first is again
+        assert other is not first
+        await shutdown_pool()
+        assert first._session is None
+        assert await acquire_session(params) is not first
+        await shutdown_pool()
+
+    asyncio.run(_scenario())
+    assert len(entered) == 3
+
+
+_STDIO_SERVER = """
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("pacs-test")
+
+
+@server.tool()
+def query_studies(study_date: str | None = None) -> list[dict]:
+    return [{"StudyDescription": "MR fetal study", "StudyDate": study_date}]
+
+
+server.run()
+"""
+
+
+def test_pooled_stdio_session_closes_from_another_task(tmp_path) -> None:
+    script = tmp_path / "server.py"
+    script.write_text(_STDIO_SERVER, encoding="utf-8")
+    params = build_stdio_server_params(sys.executable, args=[str(script)])
+
+    async def _handler() -> object:
+        session = await acquire_session(params)
+        return await session.query_studies(study_date="20240101")
+
+    async def _scenario() -> object:
+        # Acquire inside a short-lived handler task, then shut down from main.
+        payload = await asyncio.create_task(_handler())
+        await shutdown_pool()
+        assert not [key for key in mcp_client._SESSION_POOL if key[0] is asyncio.get_running_loop()]
+        return payload
+
+    payload = asyncio.run(asyncio.wait_for(_scenario(), timeout=30))
+
+    assert payload == [{"StudyDescription": "MR fetal study", "StudyDate": "20240101"}]
+
+
+def test_extract_tool_payload_streams_large_arrays_on_request(monkeypatch) -> None:
+    monkeypatch.setattr(mcp_client, "_STREAM_JSON_MIN_CHARS", 10)
+    records = [{"SeriesDescription": f"Série {idx}", "Slices": idx + 0.5} for idx in range(50)]
+    result = _text_result("\n  " + json.dumps(records, ensure_ascii=False))
+
+    assert _extract_tool_payload(result) == records
+    payload = _extract_tool_payload(result, stream=True)
+    if mcp_client.ijson is not None:
+        assert not isinstance(payload, list)
+    assert list(payload) == records
+    warning = "[WARN] PACS busy, " + "retry later " * 5
+    assert _extract_tool_payload(_text_result(warning), stream=True) == warning.strip()
+
+
+class TextSession:
+    def __init__(self, text: str) -> None:
+        self._text = text
+
+    async def call_tool(self, name: str, arguments: dict[str, object]) -> CallToolResult:
+        return _text_result(self._text)
+
+
+@pytest.mark.skipif(mcp_client.ijson is None, reason="ijson not installed")
+def test_truncated_streamed_payload_raises_tool_call_error(monkeypatch) -> None:
+    monkeypatch.setattr(mcp_client, "_STREAM_JSON_MIN_CHARS", 10)
+    client = _client(TextSession('[{"StudyDescription": "MR"}, {"StudyDescription": "C'))
+
+    payload = asyncio.run(client.query_studies(stream=True))
+
+    with pytest.raises(McpToolCallError) as excinfo:
+        list(payload)
+    assert excinfo.value.details["tool"] == "query_studies"
+
+
+def test_canonical_arguments_ignore_key_order(monkeypatch) -> None:
+    first = {"study_instance_uid": "1", "filters": {"modality": "MR", "date": "2024"}}
+    second = {"filters": {"date": "2024", "modality": "MR"}, "study_instance_uid": "1"}
+
+    assert mcp_client._canonical_arguments(first) == mcp_client._canonical_arguments(second)
+    monkeypatch.setattr(mcp_client, "orjson", None)
+    assert mcp_client._canonical_arguments(first) == mcp_client._canonical_arguments(second)
+    assert mcp_client._canonical_arguments(first) != mcp_client._canonical_arguments({})
+
+
+def test_call_tool_without_arguments_shares_cache_entry() -> None:
+    session = CountingSession()
+    client = _client(session)
+
+    async def _calls() -> list[object]:
+        return [
+            await client.call_tool("query_studies"),
+            await client.call_tool("query_studies", {}),
+        ]
+
+    assert asyncio.run(_calls()) == [[1], [1]]
+    assert session.calls == [("query_studies", {})]
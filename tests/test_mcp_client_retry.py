@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 
 import pytest
 
+from pacs_rag import mcp_client
 from pacs_rag.mcp_client import (
     McpSession,
     McpToolCallError,
@@ -73,3 +75,107 @@ def test_call_tool_no_retry_for_non_idempotent() -> None:
         _run(client.call_tool("move_study", {"study_instance_uid": "1"}))
 
     assert client._session.calls == 1
+
+
+def test_call_tools_many_returns_results_in_order_with_errors() -> None:
+    policy = McpRetryPolicy(timeout_seconds=0.01, max_attempts=1, backoff_seconds=(0,))
+    client = McpSession(build_stdio_server_params("dicom-mcp"), retry_policy=policy)
+    client._session = FakeSession([FakeResult([1]), OSError("boom"), FakeResult([3])])
+
+    results = _run(
+        client.call_tools_many(
+            [
+                ("query_series", {"study_instance_uid": "1"}),
+                ("query_series", {"study_instance_uid": "2"}),
+                ("query_series", {"study_instance_uid": "3"}),
+            ],
+            max_inflight=1,
+        )
+    )
+
+    assert results[0] == [1]
+    assert isinstance(results[1], McpToolCallError)
+    assert results[2] == [3]
+
+
+def test_retry_skips_error_details_when_warnings_disabled(monkeypatch) -> None:
+    built: list[str] = []
+    original = mcp_client._build_error_details
+
+    def _tracking_build(**kwargs):
+        built.append(kwargs["name"])
+        return original(**kwargs)
+
+    monkeypatch.setattr(mcp_client, "_build_error_details", _tracking_build)
+    policy = McpRetryPolicy(timeout_seconds=0.01, max_attempts=2, backoff_seconds=(0,))
+    client = McpSession(build_stdio_server_params("dicom-mcp"), retry_policy=policy)
+    client._session = FakeSession([OSError("boom"), FakeResult({"ok": True})])
+
+    previous_level = mcp_client.log.level
+    mcp_client.log.setLevel(logging.ERROR)
+    try:
+        assert _run(client.call_tool("query_studies", {})) == {"ok": True}
+    finally:
+        mcp_client.log.setLevel(previous_level)
+    assert built == []
+
+
+def test_retry_policy_controls_retryable_exceptions() -> None:
+    policy = McpRetryPolicy(
+        timeout_seconds=0.01,
+        max_attempts=3,
+        backoff_seconds=(0,),
+        retryable_exceptions=(ValueError,),
+    )
+    client = McpSession(build_stdio_server_params("dicom-mcp"), retry_policy=policy)
+    client._session = FakeSession([ValueError("flaky"), OSError("boom")])
+
+    with pytest.raises(McpToolCallError) as excinfo:
+        _run(client.call_tool("query_studies", {}))
+
+    assert client._session.calls == 2
+    assert excinfo.value.details["error_type"] == "OSError"
+    assert excinfo.value.details["retryable"] is False
+
+
+def test_retry_warning_logs_details_with_backoff(caplog) -> None:
+    policy = McpRetryPolicy(timeout_seconds=0.01, max_attempts=2, backoff_seconds=(0,))
+    client = McpSession(build_stdio_server_params("dicom-mcp"), retry_policy=policy)
+    client._session = FakeSession([OSError("boom"), FakeResult({"ok": True})])
+
+    with caplog.at_level(logging.WARNING, logger=mcp_client.log.name):
+        assert _run(client.call_tool("query_studies", {"study_date": "2024"})) == {"ok": True}
+
+    (record,) = caplog.records
+    assert record.extra_data["attempt"] == 1
+    assert record.extra_data["argument_keys"] == ["study_date"]
+    assert record.extra_data["backoff_seconds"] == 0
+
+
+def test_backoff_is_jittered_within_policy_bounds(monkeypatch) -> None:
+    sleeps: list[float] = []
+
+    async def _fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(mcp_client, "_sleep", _fake_sleep)
+    policy = McpRetryPolicy(timeout_seconds=0.01, max_attempts=3, backoff_seconds=(1.0, 2.0))
+    client = McpSession(build_stdio_server_params("dicom-mcp"), retry_policy=policy)
+    client._session = FakeSession([OSError("a"), OSError("b"), FakeResult([])])
+
+    assert _run(client.call_tool("query_studies", {})) == []
+    assert 0.5 <= sleeps[0] <= 1.5
+    assert 1.0 <= sleeps[1] <= 3.0
+
+    steady = McpRetryPolicy(backoff_seconds=(1.0,), backoff_jitter=0.0)
+    assert mcp_client._backoff_for_attempt(4, steady) == 1.0
+
+
+def test_no_retry_session_makes_a_single_attempt() -> None:
+    client = McpSession.no_retry(build_stdio_server_params("dicom-mcp"))
+    client._session = FakeSession([OSError("boom"), FakeResult({"ok": True})])
+
+    with pytest.raises(McpToolCallError):
+        _run(client.call_tool("query_studies", {}))
+
+    assert client._session.calls == 1
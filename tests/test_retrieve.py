@@ -1,12 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import importlib
+import json
+import sqlite3
+import threading
+
 import yaml
 
 from pacs_rag.embedder import HashEmbeddingProvider
 from pacs_rag.index import SqliteIndex
 from pacs_rag.lexicon import cluster_terms, suggest_ngrams
 from pacs_rag.ingest import ingest_terms
-from pacs_rag.retrieve import retrieve
+from pacs_rag.retrieve import RetrieveBatcher, retrieve, retrieve_many
+
+
+@dataclass
+class CountingEmbedder(HashEmbeddingProvider):
+    batches: list[list[str]] = field(default_factory=list, repr=False, compare=False)
+    queries: list[str] = field(default_factory=list, repr=False, compare=False)
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return super().embed(texts)
+
+    def embed_one(self, text):
+        self.queries.append(text)
+        return super().embed_one(text)
 
 
 def test_ingest_and_retrieve(tmp_path) -> None:
@@ -67,3 +89,225 @@ def test_export_lexicon(tmp_path) -> None:
     assert "MR fetal study" in loaded["synonyms"]
     assert "CT cranial" not in loaded["synonyms"]
     assert any(item["text"] == "mr fetal" for item in loaded["ngrams"])
+
+
+def test_legacy_json_vectors_are_migrated(tmp_path) -> None:
+    index_path = tmp_path / "terms.sqlite"
+    embedder = HashEmbeddingProvider(dim=16)
+    with sqlite3.connect(index_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE terms (
+                text TEXT NOT NULL,
+                level TEXT NOT NULL,
+                modality TEXT NOT NULL,
+                count INTEGER,
+                last_seen_date TEXT,
+                vector TEXT,
+                PRIMARY KEY (text, level, modality)
+            )
+            """
+        )
+        vector_json = json.dumps(embedder.embed(["CT cranial"])[0].tolist())
+        conn.execute(
+            "INSERT INTO terms VALUES (?, ?, ?, ?, ?, ?)",
+            ("CT cranial", "study", "CT", 1, "20240101", vector_json),
+        )
+
+    with SqliteIndex(str(index_path)) as index:
+        results = index.retrieve(embedder.embed(["cranial"])[0], top_k=5, min_score=0.0)
+
+    assert [item.text for item in results] == ["CT cranial"]
+    with sqlite3.connect(index_path) as conn:
+        (kind,) = conn.execute("SELECT typeof(vector) FROM terms").fetchone()
+    assert kind == "blob"
+
+
+def test_retrieve_scores_unnormalized_vectors_as_cosine(tmp_path) -> None:
+    with SqliteIndex(str(tmp_path / "terms.sqlite")) as index:
+        index.upsert_terms(
+            [{"text": "MR brain"}, {"text": "CT chest"}],
+            [[3.0, 4.0], [4.0, -3.0]],
+        )
+        results = index.retrieve([6.0, 8.0], top_k=5, min_score=-1.0)
+
+    assert [item.text for item in results] == ["MR brain", "CT chest"]
+    assert abs(results[0].score - 1.0) < 1e-6
+    assert abs(results[1].score) < 1e-6
+
+
+def test_lexicon_accepts_weighted_terms() -> None:
+    weighted = [("MR fetal study", 3), ("MR fetal brain", 1)]
+    replicated = ["MR fetal study"] * 3 + ["MR fetal brain"]
+
+    assert suggest_ngrams(weighted, n=2, min_count=2) == suggest_ngrams(
+        replicated, n=2, min_count=2
+    )
+    clusters = cluster_terms(weighted, min_jaccard=0.3)
+    assert [(cluster.terms, cluster.count) for cluster in clusters] == [
+        (["MR fetal study", "MR fetal brain"], 4)
+    ]
+
+
+def test_ingest_terms_streams_in_chunks(tmp_path) -> None:
+    index_path = tmp_path / "terms.sqlite"
+    embedder = CountingEmbedder(dim=8)
+    terms = ({"text": f"MR series {idx}"} for idx in range(5))
+    ingest_terms(str(index_path), terms, embedder, chunk_size=2)
+
+    assert [len(batch) for batch in embedder.batches] == [2, 2, 1]
+    with SqliteIndex(str(index_path)) as index:
+        assert len(index.top_terms(min_count=1)) == 5
+
+
+def test_retrieve_reuses_open_index(tmp_path, monkeypatch) -> None:
+    # pacs_rag.retrieve is re-exported as the function, so fetch the module itself.
+    retrieve_module = importlib.import_module("pacs_rag.retrieve")
+    index_path = str(tmp_path / "terms.sqlite")
+    embedder = HashEmbeddingProvider(dim=8)
+    ingest_terms(index_path, [{"text": "MR fetal study"}], embedder)
+    opened: list[str] = []
+
+    class TrackingIndex(SqliteIndex):
+        def __init__(self, path: str) -> None:
+            opened.append(path)
+            super().__init__(path)
+
+    monkeypatch.setattr(retrieve_module, "SqliteIndex", TrackingIndex)
+    monkeypatch.setattr(retrieve_module, "_INDEX_CACHE", type(retrieve_module._INDEX_CACHE)())
+    for query in ["fetal", "MR", "study"]:
+        assert retrieve(index_path, query, min_score=-1.0, embedder=embedder)
+
+    assert opened == [index_path]
+    retrieve_module._close_indexes()
+
+
+def test_retrieve_opens_one_index_per_thread(tmp_path) -> None:
+    retrieve_module = importlib.import_module("pacs_rag.retrieve")
+    index_path = str(tmp_path / "terms.sqlite")
+    ingest_terms(index_path, [{"text": "MR fetal study"}], HashEmbeddingProvider(dim=8))
+
+    main = retrieve_module._get_index(index_path)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(retrieve_module._get_index, index_path).result()
+
+    assert other is not main
+    assert retrieve_module._get_index(index_path) is main
+
+
+def test_retrieve_many_embeds_queries_in_one_batch(tmp_path) -> None:
+    index_path = str(tmp_path / "terms.sqlite")
+    embedder = CountingEmbedder(dim=16)
+    ingest_terms(index_path, [{"text": "MR fetal study"}, {"text": "CT cranial"}], embedder)
+    embedder.batches.clear()
+
+    results = retrieve_many(index_path, ["fetal", "", "cranial"], min_score=0.1, embedder=embedder)
+
+    assert embedder.batches == [["fetal", "cranial"]]
+    assert [[item.text for item in items] for items in results] == [
+        ["MR fetal study"],
+        [],
+        ["CT cranial"],
+    ]
+
+
+def test_retrieve_batcher_coalesces_concurrent_queries(tmp_path) -> None:
+    index_path = str(tmp_path / "terms.sqlite")
+    embedder = CountingEmbedder(dim=16)
+    ingest_terms(index_path, [{"text": "MR fetal study"}, {"text": "CT cranial"}], embedder)
+    embedder.batches.clear()
+    batcher = RetrieveBatcher(index_path, embedder, min_score=0.1, window_seconds=0.01)
+
+    async def _queries():
+        return await asyncio.gather(*(batcher.retrieve(q) for q in ["fetal", "cranial", "MR"]))
+
+    results = asyncio.run(_queries())
+
+    assert [len(batch) for batch in embedder.batches] == [3]
+    assert [items[0].text for items in results] == [
+        "MR fetal study",
+        "CT cranial",
+        "MR fetal study",
+    ]
+
+
+def test_retrieve_batcher_runs_overlapping_batches(tmp_path) -> None:
+    index_path = str(tmp_path / "terms.sqlite")
+    ingest_terms(
+        index_path,
+        [{"text": "MR fetal study"}, {"text": "CT cranial"}],
+        HashEmbeddingProvider(dim=16),
+    )
+    # Each batch waits inside embed() until the other one is in flight too.
+    both_running = threading.Barrier(2, timeout=5)
+
+    @dataclass
+    class OverlappingEmbedder(HashEmbeddingProvider):
+        def embed(self, texts):
+            both_running.wait()
+            return super().embed(texts)
+
+    batcher = RetrieveBatcher(
+        index_path, OverlappingEmbedder(dim=16), min_score=0.1, max_batch=1
+    )
+
+    async def _queries():
+        return await asyncio.gather(batcher.retrieve("fetal"), batcher.retrieve("cranial"))
+
+    results = asyncio.run(_queries())
+
+    assert [[item.text for item in items] for items in results] == [
+        ["MR fetal study"],
+        ["CT cranial"],
+    ]
+
+def test_retrieve_skips_blank_queries_and_caches_answers(tmp_path) -> None:
+    index_path = str(tmp_path / "terms.sqlite")
+    embedder = CountingEmbedder(dim=16)
+    ingest_terms(index_path, [{"text": "MR fetal study"}], embedder)
+
+    assert retrieve(index_path, "  \t", embedder=embedder) == []
+    first = retrieve(index_path, "cranial", min_score=0.5, embedder=embedder)
+    again = retrieve(index_path, "cranial", min_score=0.5, embedder=embedder)
+    assert first == again == []
+    assert embedder.queries == ["cranial"]
+
+    ingest_terms(index_path, [{"text": "CT cranial"}], embedder)
+    results = retrieve(index_path, "cranial", min_score=0.5, embedder=embedder)
+    assert [item.text for item in results] == ["CT cranial"]
+    assert embedder.queries == ["cranial", "cranial"]
+
+
+def test_retrieve_reopens_replaced_index(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    embedder = HashEmbeddingProvider(dim=16)
+    ingest_terms("terms.sqlite", [{"text": "MR fetal brain"}], embedder)
+    first = retrieve("terms.sqlite", "fetal", min_score=0.1, embedder=embedder)
+    assert [item.text for item in first] == ["MR fetal brain"]
+
+    for suffix in ["", "-wal", "-shm"]:
+        (tmp_path / f"terms.sqlite{suffix}").unlink(missing_ok=True)
+    ingest_terms(str(tmp_path / "terms.sqlite"), [{"text": "CT chest fetal"}], embedder)
+
+    for _ in range(2):
+        results = retrieve("terms.sqlite", "fetal", min_score=0.1, embedder=embedder)
+        assert [item.text for item in results] == ["CT chest fetal"]
+
+
+def test_retrieve_does_not_cache_providers_keyed_by_address(tmp_path) -> None:
+    index_path = str(tmp_path / "terms.sqlite")
+    ingest_terms(index_path, [{"text": "MR fetal study"}], HashEmbeddingProvider(dim=16))
+    calls: list[str] = []
+
+    class PlainProvider:
+        def embed(self, texts):
+            calls.extend(texts)
+            return HashEmbeddingProvider(dim=16).embed(texts)
+
+    class KeyedProvider(PlainProvider):
+        cache_key = "plain-hash-16"
+
+    for provider in [PlainProvider(), PlainProvider(), KeyedProvider(), KeyedProvider()]:
+        assert retrieve(index_path, "fetal", min_score=0.1, embedder=provider)
+
+    assert calls == ["fetal", "fetal", "fetal"]